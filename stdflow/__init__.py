@@ -26,9 +26,15 @@ __version__ = "0.0.73"
 
 import logging
 import sys
+from concurrent.futures import Future
 
 from stdflow.stdflow_types.strftime_type import Strftime
 from stdflow.step import GStep
+from stdflow.stdflow_utils.background import background_writer
+from stdflow.stdflow_utils.cache import load_cache
+from stdflow.stdflow_utils import resolve_latest
+from stdflow.stdflow_utils.record_store import compact_root
+from stdflow.stdflow_utils.retention import RetentionPolicy, collect_garbage
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -185,6 +191,14 @@ class Module(object):
     def file_name(self, file_name: str) -> None:
         self.step.file_name = file_name
 
+    @property
+    def retention(self) -> RetentionPolicy | None:
+        return self.step.retention
+
+    @retention.setter
+    def retention(self, retention: RetentionPolicy | None) -> None:
+        self.step.retention = retention
+
     def load(
         self,
         *,
@@ -197,6 +211,14 @@ class Module(object):
         alias: str = ":ignore",
         file_glob: bool = False,
         verbose: bool = False,
+        chunksize: int | None = None,
+        stream: bool = False,
+        columns: list[str] | None = None,
+        filters: list | None = None,
+        cache: bool = False,
+        shadow: bool = False,
+        combine: Literal["concat", "dict"] | None = None,
+        max_workers: int | None = None,
         **kwargs,
     ) -> Tuple[Any, dict] | Any:
         return self.step.load(
@@ -209,6 +231,14 @@ class Module(object):
             alias=alias,
             file_glob=file_glob,
             verbose=verbose,
+            chunksize=chunksize,
+            stream=stream,
+            columns=columns,
+            filters=filters,
+            cache=cache,
+            shadow=shadow,
+            combine=combine,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -225,8 +255,14 @@ class Module(object):
         alias: str = ":ignore",
         export_viz_tool: bool = False,
         verbose: bool = False,
+        background: bool = False,
+        stats: bool = False,
+        content_hash: bool = False,
+        skip_if_unchanged: bool = False,
+        retention: RetentionPolicy | None | Literal[":default"] = ":default",
+        dedup: bool = False,
         **kwargs,
-    ) -> DataPath:
+    ) -> DataPath | Future:
         return self.step.save(
             data,
             root=root,
@@ -238,9 +274,32 @@ class Module(object):
             alias=alias,
             export_viz_tool=export_viz_tool,
             verbose=verbose,
+            background=background,
+            stats=stats,
+            content_hash=content_hash,
+            skip_if_unchanged=skip_if_unchanged,
+            retention=retention,
+            dedup=dedup,
             **kwargs,
         )
 
+    def flush(self, timeout: float | None = None) -> None:
+        return background_writer.flush(timeout)
+
+    def compact(self, root: str | Literal[":default"] = ":default") -> dict:
+        return compact_root(self.step.root if root == ":default" else root)
+
+    def gc(
+        self, policy: RetentionPolicy, root: str | Literal[":default"] = ":default", dry_run: bool = False
+    ) -> dict:
+        return collect_garbage(self.step.root if root == ":default" else root, policy, dry_run=dry_run)
+
+    async def aload(self, **kwargs) -> Any:
+        return await self.step.aload(**kwargs)
+
+    async def asave(self, data: pd.DataFrame, **kwargs) -> DataPath:
+        return await self.step.asave(data, **kwargs)
+
     def reset(self):
         return self.step.reset()
 
@@ -515,6 +574,16 @@ def file_name(file_name: str) -> None:
     ...
 
 
+@property
+def retention() -> RetentionPolicy | None:
+    ...
+
+
+@retention.setter
+def retention(retention: RetentionPolicy | None) -> None:
+    ...
+
+
 def load(
     *,
     root: str | Literal[":default"] = ":default",
@@ -526,6 +595,14 @@ def load(
     alias: str = ":ignore",
     file_glob: bool = False,
     verbose: bool = False,
+    chunksize: int | None = None,
+    stream: bool = False,
+    columns: list[str] | None = None,
+    filters: list | None = None,
+    cache: bool = False,
+    shadow: bool = False,
+    combine: Literal["concat", "dict"] | None = None,
+    max_workers: int | None = None,
     **kwargs,
 ) -> Tuple[Any, dict] | Any:
     ...
@@ -543,8 +620,34 @@ def save(
     alias: str = ":ignore",
     export_viz_tool: bool = False,
     verbose: bool = False,
+    background: bool = False,
+    stats: bool = False,
+    content_hash: bool = False,
+    skip_if_unchanged: bool = False,
+    retention: RetentionPolicy | None | Literal[":default"] = ":default",
+    dedup: bool = False,
     **kwargs,
-) -> DataPath:
+) -> DataPath | Future:
+    ...
+
+
+def flush(timeout: float | None = None) -> None:
+    ...
+
+
+def compact(root: str | Literal[":default"] = ":default") -> dict:
+    ...
+
+
+def gc(policy: RetentionPolicy, root: str | Literal[":default"] = ":default", dry_run: bool = False) -> dict:
+    ...
+
+
+async def aload(**kwargs) -> Any:
+    ...
+
+
+async def asave(data: pd.DataFrame, **kwargs) -> DataPath:
     ...
 
 
@@ -0,0 +1,41 @@
+import argparse
+from datetime import timedelta
+
+from stdflow.stdflow_utils.record_store import compact_root
+from stdflow.stdflow_utils.retention import RetentionPolicy, collect_garbage
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m stdflow", description="Maintenance of a data root")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser(
+        "compact", help="Move the ancestor records duplicated across metadata files to a store shared by the root"
+    )
+    compact.add_argument("root", help="data root")
+    gc = subparsers.add_parser(
+        "gc", help="Delete the versions not kept by the retention policy, except the ones kept files come from"
+    )
+    gc.add_argument("root", help="data root")
+    gc.add_argument("--keep-last", type=int, help="number of most recent versions to keep per step")
+    gc.add_argument("--newer-than-days", type=float, help="keep the versions created less than this many days ago")
+    gc.add_argument("--max-bytes", type=int, help="size budget of the versions of each step")
+    gc.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        summary = compact_root(args.root)
+        print(
+            f"Compacted {summary['metadata_files']} metadata files: {summary['bytes_before']} -> "
+            f"{summary['bytes_after']} bytes, {summary['records_stored']} records added to the store"
+        )
+    else:
+        policy = RetentionPolicy(
+            keep_last=args.keep_last,
+            newer_than=timedelta(days=args.newer_than_days) if args.newer_than_days is not None else None,
+            max_bytes=args.max_bytes,
+        )
+        summary = collect_garbage(args.root, policy, dry_run=args.dry_run)
+        for path in summary["deleted"]:
+            print(f"{'would delete' if args.dry_run else 'deleted'} {path}")
+        for path in summary["protected"]:
+            print(f"kept for lineage {path}")
+        print(f"{summary['bytes_reclaimed']} bytes {'reclaimable' if args.dry_run else 'reclaimed'}")
@@ -19,30 +19,58 @@ d = { 'settings': { 'branch': 'main',
                                   'stdflow.pipeline.Pipeline.run': ('pipeline.html#pipeline.run', 'stdflow/pipeline.py'),
                                   'stdflow.pipeline.Pipeline.verify': ('pipeline.html#pipeline.verify', 'stdflow/pipeline.py')},
             'stdflow.stdflow_doc.documenter': {},
+            'stdflow.stdflow_index.index': {},
+            'stdflow.stdflow_loaders.arrow': {},
+            'stdflow.stdflow_loaders.compression': {},
             'stdflow.stdflow_loaders.csv': {},
+            'stdflow.stdflow_loaders.selection': {},
+            'stdflow.stdflow_loaders.shadow': {},
+            'stdflow.stdflow_loaders.stream': {},
             'stdflow.stdflow_path.data_path': {},
             'stdflow.stdflow_path.path': {},
             'stdflow.stdflow_path.process_path': {},
             'stdflow.stdflow_tree.tree': {},
             'stdflow.stdflow_types.strftime_type': {},
+            'stdflow.stdflow_utils.background': {},
             'stdflow.stdflow_utils.bt_print': {},
+            'stdflow.stdflow_utils.cache': {},
             'stdflow.stdflow_utils.caller_metadata': {},
+            'stdflow.stdflow_utils.codec': {},
             'stdflow.stdflow_utils.execution': {},
+            'stdflow.stdflow_utils.hashing': {},
             'stdflow.stdflow_utils.io': {},
+            'stdflow.stdflow_utils.journal': {},
             'stdflow.stdflow_utils.kernel': {},
             'stdflow.stdflow_utils.list_op': {},
             'stdflow.stdflow_utils.listing': {},
+            'stdflow.stdflow_utils.record_store': {},
+            'stdflow.stdflow_utils.retention': {},
+            'stdflow.stdflow_utils.stats': {},
             'stdflow.stdflow_utils.uuid_utils': {},
+            'stdflow.stdflow_utils.versions': {},
             'stdflow.step': { 'stdflow.step.GStep': ('step.html#gstep', 'stdflow/step.py'),
                               'stdflow.step.GStep.__new__': ('step.html#gstep.__new__', 'stdflow/step.py'),
                               'stdflow.step.Step': ('step.html#step', 'stdflow/step.py'),
                               'stdflow.step.Step.__dict__': ('step.html#step.__dict__', 'stdflow/step.py'),
                               'stdflow.step.Step.__init__': ('step.html#step.__init__', 'stdflow/step.py'),
+                              'stdflow.step.Step._add_input_files': ('step.html#step._add_input_files', 'stdflow/step.py'),
+                              'stdflow.step.Step._col_steps': ('step.html#step._col_steps', 'stdflow/step.py'),
+                              'stdflow.step.Step._dedup': ('step.html#step._dedup', 'stdflow/step.py'),
                               'stdflow.step.Step._files_needed_to_gen': ('step.html#step._files_needed_to_gen', 'stdflow/step.py'),
                               'stdflow.step.Step._from_dict': ('step.html#step._from_dict', 'stdflow/step.py'),
                               'stdflow.step.Step._from_file': ('step.html#step._from_file', 'stdflow/step.py'),
                               'stdflow.step.Step._from_path': ('step.html#step._from_path', 'stdflow/step.py'),
+                              'stdflow.step.Step._input_file_metadata': ('step.html#step._input_file_metadata', 'stdflow/step.py'),
+                              'stdflow.step.Step._load_files': ('step.html#step._load_files', 'stdflow/step.py'),
+                              'stdflow.step.Step._previous_version': ('step.html#step._previous_version', 'stdflow/step.py'),
+                              'stdflow.step.Step._read_file': ('step.html#step._read_file', 'stdflow/step.py'),
+                              'stdflow.step.Step._reuse_file': ('step.html#step._reuse_file', 'stdflow/step.py'),
                               'stdflow.step.Step._to_file': ('step.html#step._to_file', 'stdflow/step.py'),
+                              'stdflow.step.Step._unchanged_file': ('step.html#step._unchanged_file', 'stdflow/step.py'),
+                              'stdflow.step.Step._update_index': ('step.html#step._update_index', 'stdflow/step.py'),
+                              'stdflow.step.Step._write': ('step.html#step._write', 'stdflow/step.py'),
+                              'stdflow.step.Step.aload': ('step.html#step.aload', 'stdflow/step.py'),
+                              'stdflow.step.Step.asave': ('step.html#step.asave', 'stdflow/step.py'),
                               'stdflow.step.Step.attrs': ('step.html#step.attrs', 'stdflow/step.py'),
                               'stdflow.step.Step.attrs_in': ('step.html#step.attrs_in', 'stdflow/step.py'),
                               'stdflow.step.Step.attrs_out': ('step.html#step.attrs_out', 'stdflow/step.py'),
@@ -62,9 +90,12 @@ d = { 'settings': { 'branch': 'main',
                               'stdflow.step.Step.get_origin_names_raw': ('step.html#step.get_origin_names_raw', 'stdflow/step.py'),
                               'stdflow.step.Step.import_col': ('step.html#step.import_col', 'stdflow/step.py'),
                               'stdflow.step.Step.load': ('step.html#step.load', 'stdflow/step.py'),
+                              'stdflow.step.Step.md_all_files': ('step.html#step.md_all_files', 'stdflow/step.py'),
+                              'stdflow.step.Step.md_direct_input_files': ('step.html#step.md_direct_input_files', 'stdflow/step.py'),
                               'stdflow.step.Step.method_in': ('step.html#step.method_in', 'stdflow/step.py'),
                               'stdflow.step.Step.method_out': ('step.html#step.method_out', 'stdflow/step.py'),
                               'stdflow.step.Step.reset': ('step.html#step.reset', 'stdflow/step.py'),
+                              'stdflow.step.Step.retention': ('step.html#step.retention', 'stdflow/step.py'),
                               'stdflow.step.Step.root': ('step.html#step.root', 'stdflow/step.py'),
                               'stdflow.step.Step.root_in': ('step.html#step.root_in', 'stdflow/step.py'),
                               'stdflow.step.Step.root_out': ('step.html#step.root_out', 'stdflow/step.py'),
@@ -75,7 +106,8 @@ d = { 'settings': { 'branch': 'main',
                               'stdflow.step.Step.var': ('step.html#step.var', 'stdflow/step.py'),
                               'stdflow.step.Step.version': ('step.html#step.version', 'stdflow/step.py'),
                               'stdflow.step.Step.version_in': ('step.html#step.version_in', 'stdflow/step.py'),
-                              'stdflow.step.Step.version_out': ('step.html#step.version_out', 'stdflow/step.py')},
+                              'stdflow.step.Step.version_out': ('step.html#step.version_out', 'stdflow/step.py'),
+                              'stdflow.step._loaded_columns': ('step.html#_loaded_columns', 'stdflow/step.py')},
             'stdflow.step_runner': { 'stdflow.step_runner.StepRunner': ('step_runner.html#steprunner', 'stdflow/step_runner.py'),
                                      'stdflow.step_runner.StepRunner.__init__': ( 'step_runner.html#steprunner.__init__',
                                                                                   'stdflow/step_runner.py'),
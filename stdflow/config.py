@@ -1,8 +1,11 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_config.ipynb.
 
 # %% auto 0
-__all__ = ['DEFAULT_DATE_VERSION_FORMAT', 'VERSION_PREFIX', 'STEP_PREFIX', 'DEFAULT', 'INFER', 'prefix', 'PATHS_ENV_KEY',
-           'RUN_ENV_KEY']
+__all__ = ['DEFAULT_DATE_VERSION_FORMAT', 'VERSION_PREFIX', 'STEP_PREFIX', 'DEFAULT', 'INFER', 'DEFAULT_CHUNKSIZE',
+           'DEFAULT_LOAD_CACHE_BYTES', 'SHADOW_DIR', 'DEFAULT_WRITER_THREADS', 'MAX_PENDING_WRITES',
+           'COMPRESSION_POLICY', 'COMPRESSION_SAMPLE_ROWS', 'METADATA_JOURNAL_MAX_BYTES', 'METADATA_CODEC',
+           'METADATA_CACHE_SIZE', 'HLL_PRECISION', 'INDEX_DIR', 'LINEAGE_INDEX', 'DEDUP_LINK', 'prefix',
+           'PATHS_ENV_KEY', 'RUN_ENV_KEY']
 
 # %% ../nbs/00_config.ipynb 3
 DEFAULT_DATE_VERSION_FORMAT = "%Y%m%d%H%M"
@@ -15,6 +18,50 @@ STEP_PREFIX = "step_"
 DEFAULT = "<<DEFAULT>>"
 INFER = "<<INFER>>"
 
+# number of rows per chunk when streaming a file without chunksize specified
+DEFAULT_CHUNKSIZE = 100_000
+
+# total size of the data kept in memory by Step.load(cache=True)
+DEFAULT_LOAD_CACHE_BYTES = 2 * 1024**3
+
+# hidden folder of the version directory holding the parquet copies created by Step.load(shadow=True)
+SHADOW_DIR = ".stdflow_shadow"
+
+# threads writing the data saved with Step.save(background=True)
+DEFAULT_WRITER_THREADS = 2
+
+# number of background writes queued before Step.save(background=True) blocks
+MAX_PENDING_WRITES = 8
+
+# trade-off used by Step.save(compression=":auto"): "speed", "balanced", "size" or a weight of the size in [0, 1]
+COMPRESSION_POLICY = "balanced"
+
+# number of rows written with each codec to choose the compression
+COMPRESSION_SAMPLE_ROWS = 10_000
+
+# size of the metadata.jsonl journal of a directory above which it is compacted into metadata.json on save
+METADATA_JOURNAL_MAX_BYTES = 8 * 1024**2
+
+# encoding of metadata.json: "json", "orjson" or "msgpack" (binary). Falls back to json if not installed.
+# Reading detects the encoding of each file
+METADATA_CODEC = "json"
+
+# number of parsed metadata files kept in memory by Step._from_file
+METADATA_CACHE_SIZE = 256
+
+# number of bits of the hash used to pick a HyperLogLog register in Step.save(stats=True). 2**precision registers
+HLL_PRECISION = 12
+
+# hidden folder of the data root holding the lineage index (index.db)
+INDEX_DIR = ".stdflow"
+
+# if True, Step.save creates and updates the lineage index of the root. Otherwise only an existing index is updated
+LINEAGE_INDEX = False
+
+# how Step.save(dedup=True) links a file identical to the one of the previous version: "reflink" (copy on write),
+# "hardlink", or "auto" (reflink if the file system supports it, hard link otherwise)
+DEDUP_LINK = "auto"
+
 
 # %% ../nbs/00_config.ipynb 4
 prefix = "stdflow__"
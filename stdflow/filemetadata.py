@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import itertools
 import json
 import logging
 import os
 import uuid
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import pandas as pd
 
+from stdflow.config import INFER
 from stdflow.stdflow_doc.documenter import Documenter
 from stdflow.stdflow_path import DataPath
 from stdflow.stdflow_utils import get_creation_time, string_to_uuid
@@ -17,7 +19,18 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 
+_LAZY = object()  # attribute not yet read from the record
+
+
 class FileMetaData:
+    """
+    Metadata of a file. Created from a metadata file record, the path and columns are only decoded when accessed
+    """
+
+    __slots__ = (
+        "uuid", "export_method_used", "input_files", "n_rows", "_record", "_path", "_columns", "_col_steps", "_stats",
+        "content_hash", "file_hash", "dedup",
+    )
     file_name = "metadata.json"
 
     def __init__(
@@ -28,44 +41,115 @@ class FileMetaData:
         input_files: list[dict],
         col_steps: list[dict] = None,
         uuid_: str = None,
+        n_rows: int | None = None,
+        stats: dict | None = None,
+        content_hash: str | None = None,
+        file_hash: str | None = None,
+        dedup: dict | None = None,
     ):
         # self.uuid = uuid_ or str(uuid.uuid4())
-        self.file_creation_time = str(get_creation_time(path.full_path_from_root))
         self.uuid = uuid_ or str(
-            string_to_uuid(f"{path.full_path_from_root}{self.file_creation_time}")
+            string_to_uuid(f"{path.full_path_from_root}{get_creation_time(path.full_path_from_root)}")
         )
-        self.path: DataPath = path
-        self.columns: list[dict] = columns
+        self._record: dict | None = None
+        self._path: DataPath = path
+        self._columns: list[dict] = columns
         self.export_method_used: str = export_method_used
         self.input_files: list[dict] = input_files
-        self.col_steps: list[dict] = col_steps or []
+        self._col_steps: list[dict] = col_steps or []
+        self.n_rows: int | None = n_rows
+        self._stats: dict | None = stats
+        self.content_hash: str | None = content_hash
+        # hash of the bytes of the file, and the file of a previous version it is linked to if identical
+        self.file_hash: str | None = file_hash
+        self.dedup: dict | None = dedup
+
+    @property
+    def path(self) -> DataPath:
+        if self._path is None:
+            self._path = DataPath.from_dict(self._record["step"], self._record["file_name"], self._record["file_type"])
+        return self._path
+
+    @path.setter
+    def path(self, path: DataPath) -> None:
+        self._path = path
+
+    @property
+    def columns(self) -> list[dict]:
+        if self._columns is _LAZY:  # records may be shared (metadata cache): copied as documentation changes them
+            self._columns = [dict(c) for c in self._record["columns"]]
+        return self._columns
+
+    @columns.setter
+    def columns(self, columns: list[dict]) -> None:
+        self._columns = columns
+
+    @property
+    def col_steps(self) -> list[dict]:
+        if self._col_steps is _LAZY:
+            self._col_steps = [dict(s) for s in self._record.get("col_steps") or []]
+        return self._col_steps
+
+    @col_steps.setter
+    def col_steps(self, col_steps: list[dict]) -> None:
+        self._col_steps = col_steps
+
+    @property
+    def stats(self) -> dict | None:
+        """Statistics of the columns computed on save (Step.save(stats=True)), None if not computed"""
+        if self._stats is _LAZY:
+            self._stats = self._record.get("stats")
+        return self._stats
+
+    @property
+    def file_creation_time(self) -> str:
+        return str(get_creation_time(self.path.full_path_from_root))
 
     def __dict__(self):
-        return dict(
-            file_name=self.path.file_name_no_ext,
-            file_type=self.path.extension,
+        if self._path is None:  # path unchanged since read
+            file_name, file_type, step = self._record["file_name"], self._record["file_type"], self._record["step"]
+        else:
+            file_name, file_type, step = self.path.file_name_no_ext, self.path.extension, self.path.dict_step
+        d = dict(
+            file_name=file_name,
+            file_type=file_type,
             uuid=self.uuid,
-            step=self.path.dict_step,
+            step=step,
             columns=self.columns,
             export_method_used=self.export_method_used,
             input_files=self.input_files,
             col_steps=self.col_steps,
+            n_rows=self.n_rows,
         )
+        if self.stats is not None:
+            d["stats"] = self.stats
+        if self.content_hash is not None:
+            d["content_hash"] = self.content_hash
+        if self.file_hash is not None:
+            d["file_hash"] = self.file_hash
+        if self.dedup is not None:
+            d["dedup"] = self.dedup
+        return d
 
     @classmethod
     def from_dict(cls, d):
         if not d:
             raise ValueError("d is empty")
-        path = DataPath.from_dict(d["step"], d["file_name"], d["file_type"])
-
-        return cls(
-            path=path,
-            columns=d["columns"],
-            col_steps=d["col_steps"] if "col_steps" in d else [],
-            export_method_used=d["export_method_used"],
-            input_files=d["input_files"],
-            uuid_=d["uuid"],
-        )
+        md = cls.__new__(cls)
+        md.uuid = d["uuid"]
+        md.export_method_used = d["export_method_used"]
+        md.input_files = list(d["input_files"])
+        md.n_rows = d.get("n_rows")
+        md.content_hash = d.get("content_hash")
+        md.file_hash = d.get("file_hash")
+        md.dedup = d.get("dedup")
+        # decoded on access
+        md._record = d
+        md._path = None
+        md._columns = _LAZY
+        md._col_steps = _LAZY
+        md._stats = _LAZY
+        return md
 
     @classmethod
     def from_data(
@@ -74,9 +158,29 @@ class FileMetaData:
         data: pd.DataFrame | dict | Any,
         export_method_used: str = "unknown",
         input_files: list["FileMetaData"] = None,
+        n_rows: int | None = INFER,
+        input_selections: dict[str, dict] | None = None,
+        stats: dict | None = None,
+        content_hash: str | None = None,
+        file_hash: str | None = None,
+        dedup: dict | None = None,
     ):
+        """
+        :param n_rows: number of rows of the file. inferred from data by default, None if unknown
+        :param input_selections: subset (columns, filters) of the input files loaded, by uuid
+        :param stats: statistics of the columns of the file
+        :param content_hash: identity of the content of the file
+        :param file_hash: hash of the bytes of the file
+        :param dedup: file of a previous version the file is linked to (path from the root) and how (reflink, hardlink)
+        """
         if input_files is not None:
-            input_files = list({"uuid": file.uuid} for file in input_files)
+            input_selections = input_selections or {}
+            input_files = list(
+                {"uuid": file.uuid, "selection": input_selections[file.uuid]}
+                if file.uuid in input_selections
+                else {"uuid": file.uuid}
+                for file in input_files
+            )
 
         # check if data is a dict with each value being a dataframe
         if isinstance(data, dict) and all(
@@ -90,6 +194,7 @@ class FileMetaData:
                 for data in data.values()
                 for c, t in zip(data.columns, data.dtypes)
             )
+            rows = sum(len(df) for df in data.values())
         elif type(data) == dict:
             columns = list(
                 {
@@ -98,6 +203,16 @@ class FileMetaData:
                 }
                 for k, v in data.items()
             )
+            rows = None
+        elif _is_arrow_table(data):
+            columns = list(
+                {
+                    "name": f.name,
+                    "type": str(f.type),
+                }
+                for f in data.schema
+            )
+            rows = data.num_rows
         elif type(data) == pd.DataFrame:
             columns = list(
                 {
@@ -106,10 +221,17 @@ class FileMetaData:
                 }
                 for c, t in zip(data.columns, data.dtypes)
             )
+            rows = len(data)
         else:
             logger.debug(f"unknown data type: {type(data)}")
             columns = []
-        return cls(path, columns, export_method_used, input_files or [], col_steps=None, uuid_=None)
+            rows = None
+        if n_rows == INFER:
+            n_rows = rows
+        return cls(
+            path, columns, export_method_used, input_files or [], col_steps=None, uuid_=None, n_rows=n_rows, stats=stats,
+            content_hash=content_hash, file_hash=file_hash, dedup=dedup,
+        )
 
     def __eq__(self, other):
         if isinstance(other, DataPath):
@@ -129,6 +251,112 @@ class FileMetaData:
         return self.__str__()
 
 
+# numbers of the changes of all FileMetaDataList, increasing
+_changes = itertools.count(1)
+
+
+class FileMetaDataList:
+    """
+    Ordered collection of FileMetaData indexed by uuid and by path. Behaves as a list without duplicated uuids:
+    appending a file already present is a no-op, put replaces it.
+    Files added or replaced since a change (last_change) are listed by changed_since
+    """
+
+    def __init__(self, files: Iterable[FileMetaData] = ()):
+        self._files: list[FileMetaData] = []
+        self._by_uuid: dict[str, FileMetaData] = {}
+        self._by_path: dict[str, FileMetaData] | None = None  # first file added with this path. built when needed
+        self._changed: dict[str, int] = {}  # uuid: number of the last change of the file, in change order
+        self.extend(files)
+
+    def _mark_changed(self, uuid_: str) -> None:
+        self._changed.pop(uuid_, None)
+        self._changed[uuid_] = next(_changes)
+
+    def append(self, file: FileMetaData) -> None:
+        if file.uuid in self._by_uuid:
+            return
+        self._files.append(file)
+        self._by_uuid[file.uuid] = file
+        self._mark_changed(file.uuid)
+        if self._by_path is not None:
+            self._by_path.setdefault(file.path.full_path_from_root, file)
+
+    def put(self, file: FileMetaData) -> None:
+        """Append file, or replace the file with the same uuid at its position"""
+        previous = self._by_uuid.get(file.uuid)
+        if previous is None:
+            return self.append(file)
+        self._files[self._files.index(previous)] = file
+        self._by_uuid[file.uuid] = file
+        self._mark_changed(file.uuid)
+        if self._by_path is not None:
+            path = previous.path.full_path_from_root
+            if self._by_path.get(path) is previous:
+                self._by_path[path] = file
+
+    @property
+    def last_change(self) -> int:
+        """Number of the last file added or replaced. 0 if empty"""
+        return next(reversed(self._changed.values()), 0)
+
+    def changed_since(self, change: int) -> list[FileMetaData]:
+        """Files added or replaced after change (a previous last_change), in change order"""
+        files = []
+        for uuid_, number in reversed(self._changed.items()):
+            if number <= change:
+                break
+            files.append(self._by_uuid[uuid_])
+        return files[::-1]
+
+    def extend(self, files: Iterable[FileMetaData]) -> None:
+        for file in files:
+            self.append(file)
+
+    def get(self, uuid_: str) -> FileMetaData | None:
+        return self._by_uuid.get(uuid_)
+
+    def _path_index(self) -> dict[str, FileMetaData]:
+        if self._by_path is None:
+            self._by_path = {}
+            for file in self._files:
+                self._by_path.setdefault(file.path.full_path_from_root, file)
+        return self._by_path
+
+    def get_by_path(self, path: DataPath) -> FileMetaData | None:
+        return self._path_index().get(path.full_path_from_root)
+
+    def __contains__(self, item: FileMetaData | DataPath | str) -> bool:
+        if isinstance(item, FileMetaData):
+            return item.uuid in self._by_uuid
+        if isinstance(item, DataPath):
+            return item.full_path_from_root in self._path_index()
+        return item in self._by_uuid
+
+    def __iter__(self) -> Iterator[FileMetaData]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __getitem__(self, item):
+        return self._files[item]
+
+    def __eq__(self, other):
+        return isinstance(other, (FileMetaDataList, list)) and list(self) == list(other)
+
+    def __repr__(self):
+        return repr(self._files)
+
+
+def _is_arrow_table(data: Any) -> bool:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    return isinstance(data, pa.Table)
+
+
 def get_file(files: list[dict], path: DataPath):
     return next(
         (
@@ -141,7 +369,9 @@ def get_file(files: list[dict], path: DataPath):
     )
 
 
-def get_file_md(files: list[FileMetaData], path: DataPath):
+def get_file_md(files: list[FileMetaData] | FileMetaDataList, path: DataPath):
+    if isinstance(files, FileMetaDataList):
+        return files.get_by_path(path)
     return next(
         (f for f in files if f.path.full_path_from_root == path.full_path_from_root),
         None,
@@ -0,0 +1 @@
+from stdflow.stdflow_index.index import LineageIndex, index_path
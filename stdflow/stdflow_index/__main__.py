@@ -0,0 +1,14 @@
+import argparse
+
+from stdflow.stdflow_index.index import LineageIndex
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m stdflow.stdflow_index", description="Manage the lineage index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser("rebuild", help="Recreate the index from the metadata files under root")
+    rebuild.add_argument("root", help="data root")
+    args = parser.parse_args()
+
+    index = LineageIndex(args.root)
+    n_dirs = index.rebuild()
+    print(f"Indexed {n_dirs} directories into {index.path}")
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from contextlib import closing
+
+from stdflow.config import INDEX_DIR
+from stdflow.filemetadata import FileMetaData
+from stdflow.stdflow_path import DataPath
+from stdflow.stdflow_utils.journal import JOURNAL_FILE_NAME, read_records
+from stdflow.stdflow_utils.versions import read_versions
+
+logger = logging.getLogger(__name__)
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    uuid TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    attrs TEXT NOT NULL,
+    step TEXT NOT NULL,
+    version TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    export_method_used TEXT,
+    n_rows INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+CREATE INDEX IF NOT EXISTS files_step ON files (attrs, step, version);
+CREATE TABLE IF NOT EXISTS edges (
+    child TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    PRIMARY KEY (child, parent)
+);
+CREATE INDEX IF NOT EXISTS edges_parent ON edges (parent);
+"""
+
+_columns = ["uuid", "path", "attrs", "step", "version", "file_name", "export_method_used", "n_rows"]
+
+
+def index_path(root: str) -> str:
+    return os.path.join(root, INDEX_DIR, "index.db")
+
+
+def _attrs(attrs: list | str | None) -> str:
+    if isinstance(attrs, list):
+        return "/".join(attrs)
+    return attrs or ""
+
+
+class LineageIndex:
+    """
+    SQLite index of the files saved under a data root and of their input files.
+    Rebuildable at any time from the metadata files with rebuild()
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.path = index_path(root)
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_schema)
+        return connection
+
+    def add(self, files: list[FileMetaData]) -> None:
+        """Insert or update files and their input edges"""
+        rows = [
+            (
+                f.uuid,
+                f.path.full_path_from_root,
+                _attrs(f.path.attrs),
+                f.path.step_name or "",
+                f.path.version or "",
+                f.path.file_name,
+                f.export_method_used,
+                f.n_rows,
+            )
+            for f in files
+        ]
+        edges = [(f.uuid, input_file["uuid"]) for f in files for input_file in f.input_files]
+        with closing(self._connect()) as connection, connection:
+            # replacing moves the row last: the latest record of a path is the one with the highest rowid
+            connection.executemany(f"INSERT OR REPLACE INTO files VALUES ({', '.join('?' * len(_columns))})", rows)
+            # a file saved again replaces its inputs
+            connection.executemany("DELETE FROM edges WHERE child = ?", [(f.uuid,) for f in files])
+            connection.executemany("INSERT OR IGNORE INTO edges VALUES (?, ?)", edges)
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict]:
+        with closing(self._connect()) as connection:
+            return [dict(zip(_columns, row)) for row in connection.execute(sql, params)]
+
+    def file(self, path: str) -> dict | None:
+        """Latest file saved at path, relative to the root (e.g. fr/step_raw/v_1/data.csv)"""
+        rows = self._query("SELECT * FROM files WHERE path = ? ORDER BY rowid DESC LIMIT 1", (path,))
+        return rows[0] if rows else None
+
+    def _closure(self, uuid: str, from_: str, to: str) -> list[dict]:
+        return self._query(
+            f"""
+            WITH RECURSIVE related(uuid) AS (
+                SELECT {to} FROM edges WHERE {from_} = ?
+                UNION
+                SELECT edges.{to} FROM edges JOIN related ON edges.{from_} = related.uuid
+            )
+            SELECT files.* FROM files JOIN related USING (uuid) ORDER BY files.path
+            """,
+            (uuid,),
+        )
+
+    def ancestors(self, uuid: str) -> list[dict]:
+        """All files needed to generate the file"""
+        return self._closure(uuid, "child", "parent")
+
+    def descendants(self, uuid: str) -> list[dict]:
+        """All files generated from the file"""
+        return self._closure(uuid, "parent", "child")
+
+    def latest_version(self, attrs: list | str | None, step: str | None) -> str | None:
+        """
+        Last version of the step in the same order as version=":last": by creation time from the version index of the
+        step, by name for versions it does not list
+        """
+        with closing(self._connect()) as connection:
+            versions = [
+                version for (version,) in connection.execute(
+                    "SELECT DISTINCT version FROM files WHERE attrs = ? AND step = ? AND version != ''",
+                    (_attrs(attrs), step or ""),
+                )
+            ]
+        if not versions:
+            return None
+        step_dir = DataPath(self.root, attrs=attrs, step_name=step, version=None, file_name=None).step_dir
+        created = {v["version"]: v["created"] for v in read_versions(step_dir) or []}
+        return max(versions, key=lambda v: (v in created, created.get(v, 0), v))
+
+    def clear(self) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM edges")
+            connection.execute("DELETE FROM files")
+
+    def rebuild(self) -> int:
+        """
+        Recreate the index from the metadata files found under the root
+        :return: number of metadata files read
+        """
+        self.clear()
+        n_dirs = 0
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            dir_names[:] = sorted(d for d in dir_names if not d.startswith("."))
+            if "metadata.json" not in file_names and JOURNAL_FILE_NAME not in file_names:
+                continue
+            try:
+                records = read_records(os.path.join(dir_path, "metadata.json"))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable metadata in {dir_path}: {e!r}")
+                continue
+            self.add([FileMetaData.from_dict(record) for record in records])
+            n_dirs += 1
+        logger.info(f"Lineage index {self.path} rebuilt from {n_dirs} metadata files")
+        return n_dirs
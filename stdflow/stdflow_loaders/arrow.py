@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+
+from stdflow.stdflow_loaders.selection import filters_to_expression
+
+
+def load_arrow(
+    path: str,
+    memory_map: bool = True,
+    as_pandas: bool = False,
+    columns: list | None = None,
+    filters: list | None = None,
+    **kwargs,
+):
+    """
+    Load a feather / arrow IPC or parquet file as a pyarrow Table.
+    With memory_map, an uncompressed feather / arrow file is not copied: the Table points to the OS page cache,
+    which is shared between all processes reading the same file.
+    :param as_pandas: return an Arrow-backed DataFrame (pd.ArrowDtype columns) instead of a Table
+    :param filters: rows to keep, in the pyarrow DNF format [(col, op, value), ...]
+    :param kwargs: passed to pyarrow.parquet.read_table or pyarrow.feather.read_table
+    """
+    if os.path.splitext(path)[-1][1:] == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=memory_map, **kwargs)
+    else:
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, memory_map=memory_map, **kwargs)
+        if filters:
+            table = table.filter(filters_to_expression(filters))
+        if columns is not None:
+            table = table.select(columns)
+    if as_pandas:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table
+
+
+def save_to_arrow(data, path: str, compression: str = "uncompressed", **kwargs) -> None:
+    """
+    Save a DataFrame or a pyarrow Table to an arrow IPC (feather v2) file.
+    Uncompressed by default so that load_arrow can memory-map it without copy
+    """
+    import pyarrow.feather as feather
+
+    feather.write_feather(data, path, compression=compression, **kwargs)
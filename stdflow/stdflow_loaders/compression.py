@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import io
+import logging
+import re
+import time
+from typing import Callable
+
+import pandas as pd
+
+from stdflow.config import COMPRESSION_POLICY, COMPRESSION_SAMPLE_ROWS
+
+logger = logging.getLogger(__name__)
+
+# weight of the compressed size against the write + read time
+policies = dict(speed=0.25, balanced=0.5, size=0.9)
+
+# first bytes of files written by the codecs pandas can read from a text or pickle file
+_magic_numbers = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"BZh": "bz2",  # followed by the block size and the block header, checked in sniff_compression
+    b"\xfd7zXZ\x00": "xz",
+}
+
+# codecs tried per format, as (codec, level). codec None is no compression
+_arrow_candidates = [(None, None), ("lz4", None), ("zstd", 1), ("zstd", 3), ("zstd", 9)]
+_parquet_candidates = [(None, None), ("snappy", None), ("lz4", None), ("zstd", 1), ("zstd", 3), ("zstd", 9), ("gzip", 6)]
+_text_candidates = [(None, None), ("gzip", 1), ("gzip", 6), ("bz2", 9), ("xz", 1), ("zstd", 1), ("zstd", 3), ("zstd", 9)]
+_text_level_key = dict(gzip="compresslevel", bz2="compresslevel", xz="preset", zstd="level")
+
+
+def _arrow_kwargs(codec: str | None, level: int | None) -> dict:
+    kwargs = dict(compression=codec or "uncompressed")
+    if level is not None:
+        kwargs["compression_level"] = level
+    return kwargs
+
+
+def _parquet_kwargs(codec: str | None, level: int | None) -> dict:
+    kwargs = dict(compression=codec)
+    if level is not None:
+        kwargs["compression_level"] = level
+    return kwargs
+
+
+def _text_kwargs(codec: str | None, level: int | None) -> dict:
+    if codec is None:
+        return dict(compression=None)
+    compression = dict(method=codec)
+    if level is not None:
+        compression[_text_level_key[codec]] = level
+    return dict(compression=compression)
+
+
+def _write_arrow(data: pd.DataFrame, buffer: io.BytesIO, **kwargs) -> None:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    feather.write_feather(pa.Table.from_pandas(data), buffer, **kwargs)
+
+
+# format: (codecs tried, codec to kwargs of the saver, sample writer, sample reader)
+_formats = dict(
+    parquet=(_parquet_candidates, _parquet_kwargs, pd.DataFrame.to_parquet, pd.read_parquet),
+    arrow=(_arrow_candidates, _arrow_kwargs, _write_arrow, pd.read_feather),
+    feather=(_arrow_candidates, _arrow_kwargs, _write_arrow, pd.read_feather),
+    csv=(_text_candidates, _text_kwargs, pd.DataFrame.to_csv, pd.read_csv),
+    json=(_text_candidates, _text_kwargs, pd.DataFrame.to_json, pd.read_json),
+    jsonl=(
+        _text_candidates,
+        _text_kwargs,
+        lambda df, buffer, **kw: df.to_json(buffer, orient="records", lines=True, **kw),
+        lambda buffer, **kw: pd.read_json(buffer, lines=True, **kw),
+    ),
+    pickle=(_text_candidates, _text_kwargs, pd.DataFrame.to_pickle, pd.read_pickle),
+)
+
+
+def _codec_available(method_name: str, codec: str | None) -> bool:
+    if codec is None:
+        return True
+    if method_name in ["parquet", "arrow", "feather"]:
+        import pyarrow as pa
+
+        return pa.Codec.is_available(codec)
+    if codec == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+def _measure(data: pd.DataFrame, write: Callable, read: Callable, kwargs: dict) -> tuple[int, float]:
+    """Size in bytes and time in seconds to write then read data with kwargs"""
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    write(data, buffer, **kwargs)
+    size = buffer.tell()
+    buffer.seek(0)
+    compression = kwargs.get("compression")
+    if isinstance(compression, dict):  # levels are only for writing
+        read(buffer, compression=dict(method=compression["method"]))
+    elif compression is None:
+        read(buffer, compression=None)
+    else:  # parquet and arrow files are decoded from their own metadata
+        read(buffer)
+    return size, time.perf_counter() - start
+
+
+def auto_compression(
+    data: pd.DataFrame,
+    method_name: str,
+    policy: str | float = COMPRESSION_POLICY,
+    sample_rows: int = COMPRESSION_SAMPLE_ROWS,
+) -> dict:
+    """
+    Choose the codec and level of the file by writing a sample of data with each candidate
+    :param data: data to save
+    :param method_name: name of the saving method (parquet, csv, ...)
+    :param policy: "speed", "balanced", "size" or the weight of the size against the time in [0, 1]
+    :return: keyword arguments to pass to the saving method
+    """
+    if method_name not in _formats:
+        raise ValueError(f'compression=":auto" not supported for method {method_name}. Use one of {list(_formats)}')
+    weight = policies[policy] if isinstance(policy, str) else float(policy)
+    if not 0 <= weight <= 1:
+        raise ValueError(f"policy must be one of {list(policies)} or a number in [0, 1]. Got {policy}")
+    candidates, to_kwargs, write, read = _formats[method_name]
+    sample = data.head(sample_rows)
+
+    results = []
+    for codec, level in candidates:
+        if not _codec_available(method_name, codec):
+            continue
+        kwargs = to_kwargs(codec, level)
+        try:
+            size, duration = _measure(sample, write, read, kwargs)
+        except Exception as e:
+            logger.debug(f"codec {codec} level {level} failed on {method_name}: {e!r}")
+            continue
+        results.append((size, duration, kwargs))
+    if not results:
+        raise ValueError(f"No compression codec could write the data with method {method_name}")
+    min_size = min(size for size, _, _ in results) or 1
+    min_duration = min(duration for _, duration, _ in results) or 1e-9
+    # geometric trade-off: relative size and relative time compared to the best codec on each
+    size, duration, kwargs = min(
+        results,
+        key=lambda r: (max(r[0], 1) / min_size) ** weight * (max(r[1], 1e-9) / min_duration) ** (1 - weight),
+    )
+    logger.debug(f"compression {describe(kwargs)} chosen for {method_name}: {size} bytes sample in {duration:.4f}s")
+    return kwargs
+
+
+def describe(kwargs: dict) -> str:
+    """Short text of the compression used, such as zstd:3"""
+    compression = kwargs.get("compression")
+    if isinstance(compression, dict):
+        codec = compression.get("method")
+        level = next((v for k, v in compression.items() if k != "method"), None)
+    else:
+        codec, level = compression, kwargs.get("compression_level")
+    codec = "none" if codec in [None, "uncompressed"] else codec
+    return codec if level is None else f"{codec}:{level}"
+
+
+def recorded_compression(method_used: str | None) -> str | None:
+    """Codec recorded in the export method of the metadata of a file ("none" if not compressed). None if not recorded"""
+    match = re.search(r" compression=([^\s:]+)", method_used or "")
+    return match.group(1) if match else None
+
+
+def sniff_compression(path: str) -> str | None:
+    """Codec used to compress the file, found from its first bytes"""
+    with open(path, "rb") as f:
+        head = f.read(10)
+    for magic, codec in _magic_numbers.items():
+        if head.startswith(magic):
+            if codec == "bz2" and not re.match(rb"BZh[1-9]1AY&SY", head):  # text starting with BZh
+                continue
+            return codec
+    return None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import operator
+from typing import Any, Callable
+
+import pandas as pd
+
+# filters use the pyarrow DNF format: [(col, op, value), ...] or [[(col, op, value), ...], ...] (OR of ANDs)
+_operators: dict[str, Callable] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def normalize_filters(filters: list | None) -> list[list[tuple]] | None:
+    """Convert filters to a list of conjunctions"""
+    if not filters:
+        return None
+    if isinstance(filters[0], (tuple, list)) and isinstance(filters[0][0], str):
+        filters = [filters]
+    return [[tuple(f) for f in conjunction] for conjunction in filters]
+
+
+def filter_columns(filters: list | None) -> list[str]:
+    return list(dict.fromkeys(col for conjunction in normalize_filters(filters) or [] for col, _, _ in conjunction))
+
+
+def filters_to_expression(filters: list):
+    import pyarrow.parquet as pq
+
+    # public since pyarrow 10
+    to_expression = getattr(pq, "filters_to_expression", None) or pq._filters_to_expression
+    return to_expression(normalize_filters(filters))
+
+
+def select_frame(data: Any, columns: list | None = None, filters: list | None = None) -> Any:
+    """Keep the rows matching filters then the given columns. Data that are not DataFrames are returned as is"""
+    if not isinstance(data, pd.DataFrame):
+        return data
+    if filters:
+        mask = pd.Series(False, index=data.index)
+        for conjunction in normalize_filters(filters):
+            matching = pd.Series(True, index=data.index)
+            for col, op, value in conjunction:
+                if op not in _operators:
+                    raise ValueError(f"filter operator {op} not in {list(_operators.keys())}")
+                matching &= _operators[op](data[col], value)
+            mask |= matching
+        data = data[mask]
+    if columns is not None:
+        data = data[list(columns)]
+    return data
+
+
+def load_selection(method_name: str, load: Callable, path: str, columns: list | None, filters: list | None, **kwargs):
+    """
+    Load only the given columns and rows of a file.
+    Pushed down to the reader for parquet (row group statistics skipping), feather and arrow,
+    projection only for csv. Other formats are loaded entirely then selected
+    """
+    if method_name in ("parquet", "arrow"):
+        return load(path, columns=columns, filters=normalize_filters(filters), **kwargs)
+    if method_name == "feather":
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, columns=_with_filter_columns(columns, filters), memory_map=True)
+        if filters:
+            table = table.filter(filters_to_expression(filters))
+        return select_frame(table.to_pandas(**kwargs), columns)
+    if method_name == "csv" and columns is not None:
+        kwargs["usecols"] = _with_filter_columns(columns, filters)
+    return select_frame(load(path, **kwargs), columns, filters)
+
+
+def projection_kwargs(method_name: str, columns: list | None, filters: list | None) -> dict:
+    """Projection arguments of the chunk loaders"""
+    if columns is None:
+        return {}
+    if method_name == "parquet":
+        return dict(columns=_with_filter_columns(columns, filters))
+    if method_name == "csv":
+        return dict(usecols=_with_filter_columns(columns, filters))
+    return {}
+
+
+def selection_to_dict(columns: list | None, filters: list | None) -> dict | None:
+    """Json serializable description of the subset of a file loaded. None if the whole file is loaded"""
+    if columns is None and not filters:
+        return None
+    return dict(
+        columns=list(columns) if columns is not None else None,
+        filters=[
+            [[col, op, _to_json_value(value)] for col, op, value in conjunction]
+            for conjunction in normalize_filters(filters)
+        ]
+        if filters
+        else None,
+    )
+
+
+def merge_selections(a: dict | None, b: dict | None) -> dict | None:
+    """Subset covering both loads of the same file. None means the whole file"""
+    if a is None or b is None:
+        return None
+    columns = None
+    if a["columns"] is not None and b["columns"] is not None:
+        columns = list(dict.fromkeys(a["columns"] + b["columns"]))
+    filters = a["filters"] if a["filters"] == b["filters"] else None
+    if columns is None and filters is None:
+        return None
+    return dict(columns=columns, filters=filters)
+
+
+def _with_filter_columns(columns: list | None, filters: list | None) -> list | None:
+    if columns is None:
+        return None
+    return list(dict.fromkeys(list(columns) + filter_columns(filters)))
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        return [_to_json_value(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Callable
+
+import pandas as pd
+
+from stdflow.config import SHADOW_DIR
+from stdflow.stdflow_loaders.selection import load_selection, select_frame
+from stdflow.stdflow_utils.hashing import hash_file
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+def shadow_paths(file_path: str) -> tuple[str, str]:
+    """Parquet shadow copy of a file and its info file, in a hidden folder next to it"""
+    directory, file_name = os.path.split(file_path)
+    shadow_dir = os.path.join(directory, SHADOW_DIR)
+    return os.path.join(shadow_dir, f"{file_name}.parquet"), os.path.join(shadow_dir, f"{file_name}.json")
+
+
+def shadow_key(method: str | Callable, kwargs: dict) -> str:
+    """The shadow copy is only valid for the loading method and arguments used to create it"""
+    if not isinstance(method, str):
+        method = getattr(method, "__qualname__", repr(method))
+    return repr((method, sorted(kwargs.items())))
+
+
+def load_with_shadow(
+    file_path: str, read: Callable[[], Any], key: str, columns: list | None = None, filters: list | None = None
+) -> Any:
+    """
+    Load the parquet shadow copy of file_path if it is still valid, otherwise read the file and create the shadow.
+    The source is considered unchanged if it has the same size and either the same mtime or the same hash
+    """
+    shadow_path, info_path = shadow_paths(file_path)
+    stat = os.stat(file_path)
+    info = _read_info(info_path)
+
+    if info is not None and info["key"] == key and os.path.exists(shadow_path) and _is_fresh(info, file_path, stat):
+        logger.debug(f"Loading shadow copy {shadow_path}")
+        return load_selection("parquet", pd.read_parquet, shadow_path, columns, filters)
+
+    data = read()
+    if isinstance(data, pd.DataFrame):
+        _write_shadow(data, file_path, stat, key, shadow_path, info_path)
+    return select_frame(data, columns, filters)
+
+
+def _is_fresh(info: dict, file_path: str, stat: os.stat_result) -> bool:
+    if info["size"] != stat.st_size:
+        return False
+    if info["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    # touched or copied: compare content
+    if info["hash"] != hash_file(file_path):
+        return False
+    info["mtime_ns"] = stat.st_mtime_ns
+    _write_info(info, shadow_paths(file_path)[1])
+    return True
+
+
+def _write_shadow(
+    data: pd.DataFrame, file_path: str, stat: os.stat_result, key: str, shadow_path: str, info_path: str
+) -> None:
+    os.makedirs(os.path.dirname(shadow_path), exist_ok=True)
+    try:
+        data.to_parquet(shadow_path)
+    except Exception as e:  # e.g. columns with mixed types
+        logger.warning(f"Could not create shadow copy of {file_path}: {e}")
+        if os.path.exists(shadow_path):
+            os.remove(shadow_path)
+        return
+    _write_info(
+        dict(key=key, size=stat.st_size, mtime_ns=stat.st_mtime_ns, hash=hash_file(file_path)),
+        info_path,
+    )
+
+
+def _read_info(info_path: str) -> dict | None:
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, "r") as f:
+        return json.load(f)
+
+
+def _write_info(info: dict, info_path: str) -> None:
+    with open(info_path, "w") as f:
+        json.dump(info, f)
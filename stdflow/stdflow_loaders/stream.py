@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+from itertools import chain
+from typing import Iterator
+
+import pandas as pd
+
+from stdflow.config import DEFAULT_CHUNKSIZE
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+def iter_csv(path: str, chunksize: int | None = None, **kwargs) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(path, chunksize=chunksize or DEFAULT_CHUNKSIZE, **kwargs) as reader:
+        yield from reader
+
+
+def iter_jsonl(path: str, chunksize: int | None = None, **kwargs) -> Iterator[pd.DataFrame]:
+    with pd.read_json(path, lines=True, chunksize=chunksize or DEFAULT_CHUNKSIZE, **kwargs) as reader:
+        yield from reader
+
+
+def iter_parquet(
+    path: str, chunksize: int | None = None, columns: list | None = None, **kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over the row groups of a parquet file, or over batches of chunksize rows if specified
+    :param kwargs: passed to pyarrow Table.to_pandas
+    """
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(path) as parquet_file:
+        if chunksize is None:
+            for i in range(parquet_file.num_row_groups):
+                yield parquet_file.read_row_group(i, columns=columns).to_pandas(**kwargs)
+        else:
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas(**kwargs)
+
+
+chunk_loaders = dict(
+    csv=iter_csv,
+    parquet=iter_parquet,
+    jsonl=iter_jsonl,
+)
+
+
+def read_schema(path: str, method: str) -> pd.DataFrame | None:
+    """
+    Empty dataframe with the columns and dtypes stored in the file footer. None if the format has no footer
+    """
+    if method == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).empty_table().to_pandas()
+    if method in ("feather", "arrow"):
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.empty_table().to_pandas()
+    return None
+
+
+def peek(chunks: Iterator[pd.DataFrame]) -> tuple[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Read the first chunk without consuming it
+    :return: first chunk (empty dataframe if there is none), iterator over all chunks
+    """
+    try:
+        first = next(chunks)
+    except StopIteration:
+        return pd.DataFrame(), iter([])
+    return first, chain([first], chunks)
+
+
+class ChunkTracker:
+    """
+    Iterate over chunks while recording the schema of the first chunk and the total number of rows
+    :param stats: accumulator updated with each chunk (StatsAccumulator), if any
+    """
+
+    def __init__(self, chunks: Iterator[pd.DataFrame], stats=None):
+        self.chunks = chunks
+        self.schema: pd.DataFrame | None = None
+        self.n_rows: int = 0
+        self.stats = stats
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for chunk in self.chunks:
+            if self.schema is None:
+                self.schema = chunk.iloc[:0]
+            self.n_rows += len(chunk)
+            if self.stats is not None:
+                self.stats.update(chunk)
+            yield chunk
+
+
+def write_csv_chunks(chunks: Iterator[pd.DataFrame], path: str, **kwargs) -> None:
+    header = kwargs.pop("header", True)
+    mode = "w"
+    for chunk in chunks:
+        chunk.to_csv(path, mode=mode, header=header if mode == "w" else False, **kwargs)
+        mode = "a"
+
+
+def write_jsonl_chunks(chunks: Iterator[pd.DataFrame], path: str, **kwargs) -> None:
+    with open(path, "w") as f:
+        for chunk in chunks:
+            lines = chunk.to_json(orient="records", lines=True, **kwargs)
+            f.write(lines if lines.endswith("\n") else f"{lines}\n")
+
+
+def write_parquet_chunks(chunks: Iterator[pd.DataFrame], path: str, index: bool | None = None, **kwargs) -> None:
+    """
+    Write each chunk as a row group of the same parquet file. All chunks must share the schema of the first one
+    :param kwargs: passed to pyarrow ParquetWriter (compression, ...)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(
+                chunk, preserve_index=index, schema=writer.schema if writer is not None else None
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, **kwargs)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+chunk_savers = dict(
+    csv=write_csv_chunks,
+    parquet=write_parquet_chunks,
+    jsonl=write_jsonl_chunks,
+)
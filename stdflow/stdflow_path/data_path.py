@@ -6,9 +6,8 @@ import warnings
 
 from stdflow.stdflow_path import Path
 from stdflow.stdflow_utils.listing import (
-    list_csv_files,
-    list_excel_files,
-    list_files_glob,
+    files_by_extension,
+    list_data_files_glob,
     list_non_metadata_files,
 )
 
@@ -18,7 +17,8 @@ except ImportError:
     from typing_extensions import Literal, Optional
 
 from stdflow.config import STEP_PREFIX, VERSION_PREFIX
-from stdflow.stdflow_utils import detect_folders, fstep, fv, path_to_str, str_to_path
+from stdflow.stdflow_utils import fstep, fv, path_to_str, str_to_path
+from stdflow.stdflow_utils.versions import find_version
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -74,11 +74,13 @@ class DataPath(Path):
         if not os.path.isdir(self.dir_path):
             logger.error(f"Path {self.dir_path} does not exist")
         if glob is True and file_name is not None and file_name is not ":auto":
-            files = list_files_glob(self.dir_path, file_name)
+            files = list_data_files_glob(self.dir_path, file_name)
         else:
-            files = list_csv_files(self.dir_path)
+            # one cached pass over the directory: csv first, then excel, then any data file
+            groups = files_by_extension(self.dir_path)
+            files = groups.get("csv", [])
             if not files:
-                files = list_excel_files(self.dir_path)
+                files = groups.get("xlsx", []) + groups.get("xls", [])
                 if not files:
                     files = list_non_metadata_files(self.dir_path)
         if len(files) == 1:
@@ -96,23 +98,19 @@ class DataPath(Path):
     def detect_version(self, path, version_type):
         if version_type not in [":last", ":first"]:
             logger.warning(f"Unknown version type: {version_type}")
-        # Check for versioned directories
-        versions = detect_folders(path, VERSION_PREFIX)
+        if version_type not in [":last", ":first"]:
+            return None
+        # from the version index of the step, or its versioned directories
+        version = find_version(path, version_type)
 
-        logger.debug(f"ordered versions: {versions}")
-        if not versions:
+        logger.debug(f"{version_type} version: {version}")
+        if version is None:
             warnings.warn(
                 f"No versioned directories found in {path}"
                 f"If you don't intend to use version, set version=None",
                 category=UserWarning,
             )
-
-        if version_type == ":last":
-            return versions[-1] if versions else None
-        elif version_type == ":first":
-            return versions[0] if versions else None
-
-        return None
+        return version
 
     def __str__(self):
         return path_to_str(self.attrs, self.step_name, self.version, self.file_name)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import datetime
-import glob
 import os
+import threading
 import uuid
 from typing import Any
 
@@ -33,10 +33,60 @@ def get_arg_value(arg, default) -> Any:
     return arg
 
 
+# (directory, prefix): (mtime of the directory, sorted suffixes of its sub folders)
+_folders_cache: dict[tuple[str, str], tuple[int, list[str]]] = {}
+_folders_lock = threading.Lock()
+
+
 def detect_folders(path: str, prefix: str) -> list[str]:
-    full_path_versions = sorted(glob.glob(os.path.join(path, f"{prefix}*")))
-    suffixes = [os.path.basename(v)[len(prefix) :] for v in full_path_versions if os.path.isdir(v)]
-    return suffixes
+    """
+    Sorted suffixes of the sub folders of path starting with prefix.
+    Listings are cached until the modification time of path changes or invalidate_folders(path) is called
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    key = (os.path.abspath(path), prefix)
+    with _folders_lock:
+        cached = _folders_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+    with os.scandir(path) as entries:  # file type from the listing: no stat per entry
+        suffixes = sorted(e.name[len(prefix) :] for e in entries if e.name.startswith(prefix) and e.is_dir())
+    with _folders_lock:
+        _folders_cache[key] = (mtime, suffixes)
+    return list(suffixes)
+
+
+def invalidate_folders(path: str) -> None:
+    """Forget the cached listings of path, for file systems with coarse modification times"""
+    path = os.path.abspath(path)
+    with _folders_lock:
+        for key in [k for k in _folders_cache if k[0] == path]:
+            del _folders_cache[key]
+
+
+def resolve_latest(
+    paths: list[str], version_type: str = ":last", max_workers: int | None = None
+) -> list[str | None]:
+    """
+    Version of many steps at once, each distinct step directory being resolved once, concurrently
+    :param paths: step directories, or DataPath objects whose step directory is used
+    :param version_type: ":last" or ":first"
+    :return: version of each path, None if it has no version
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from stdflow.stdflow_utils.versions import find_version
+
+    if version_type not in [":last", ":first"]:
+        raise ValueError(f"version_type must be one of [':last', ':first'], got {version_type}")
+    step_dirs = [p.step_dir if hasattr(p, "step_dir") else p for p in paths]
+    distinct = list(dict.fromkeys(step_dirs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        versions = dict(zip(distinct, executor.map(lambda d: find_version(d, version_type), distinct)))
+    return [versions[d] for d in step_dirs]
 
 
 def retrieve_from_path(path: str, prefix: str) -> str:
@@ -101,9 +151,10 @@ def export_viz_html(metadata_file, dest):
 
     from jinja2 import Environment, FileSystemLoader
 
-    # Load metadata
-    with open(metadata_file) as f:
-        metadata = json.load(f)
+    from stdflow.stdflow_utils.journal import read_records
+
+    # Load metadata, with the records shared in the store of the root resolved
+    metadata = dict(files=read_records(metadata_file))
 
     # get_pipeline(metadata, dest)
 
@@ -123,6 +174,10 @@ def export_viz_html(metadata_file, dest):
     with open(os.path.join(dest, "metadata_viz", "styles.css"), "w") as css_file:
         css_file.write(styles_css)
 
+    # plain json copy to upload in the viewer, whatever the metadata codec
+    with open(os.path.join(dest, "metadata_viz", "metadata.json"), "w") as json_file:
+        json.dump(metadata, json_file)
+
 
 def string_to_uuid(input_string):
     return uuid.uuid5(uuid.NAMESPACE_DNS, input_string)
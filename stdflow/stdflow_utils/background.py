@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from stdflow.config import DEFAULT_WRITER_THREADS, MAX_PENDING_WRITES
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """Bounded pool of threads running deferred writes. submit blocks once max_pending writes are queued"""
+
+    def __init__(self, max_workers: int = DEFAULT_WRITER_THREADS, max_pending: int = MAX_PENDING_WRITES):
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        self._slots.acquire()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="stdflow_writer")
+            try:
+                future = self._executor.submit(fn, *args, **kwargs)
+            except BaseException:
+                self._slots.release()
+                raise
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        self._slots.release()
+        if future.exception() is None:
+            with self._lock:
+                self._pending.discard(future)
+        else:  # kept to be raised by flush
+            logger.error(f"Background write failed: {future.exception()!r}")
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait for all pending writes. Raise the first error met by one of them"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        done, not_done = wait(pending, timeout=timeout)
+        with self._lock:
+            self._pending |= not_done
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} background writes still pending after {timeout}s")
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+
+    @property
+    def n_pending(self) -> int:
+        with self._lock:
+            return sum(not f.done() for f in self._pending)
+
+
+background_writer = BackgroundWriter()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import copy
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+
+from stdflow.config import DEFAULT_LOAD_CACHE_BYTES, METADATA_CACHE_SIZE
+
+
+def data_size(data: Any) -> int:
+    """Approximate memory footprint of loaded data in bytes"""
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True, index=True).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True, index=True))
+    if isinstance(data, dict):
+        return sum(data_size(v) for v in data.values())
+    if hasattr(data, "nbytes"):  # numpy arrays, pyarrow tables
+        return int(data.nbytes)
+    return sys.getsizeof(data)
+
+
+def copy_data(data: Any) -> Any:
+    """Copy of cached data. Shallow for pandas objects when copy-on-write is enabled"""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.copy(deep=getattr(pd.options.mode, "copy_on_write", False) is not True)
+    if isinstance(data, dict):
+        return {k: copy_data(v) for k, v in data.items()}
+    if type(data).__module__.startswith("pyarrow"):  # immutable
+        return data
+    return copy.deepcopy(data)
+
+
+class LoadCache:
+    """Process-wide LRU cache of loaded files, bounded by the total size of the data it holds"""
+
+    def __init__(self, max_bytes: int = DEFAULT_LOAD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(file_path: str, method: str | Callable, **kwargs) -> tuple:
+        """
+        Files are identified by their resolved path and creation time, as FileMetaData uuids are.
+        The loading method and its arguments are part of the key as they change the data loaded
+        """
+        if not isinstance(method, str):
+            method = getattr(method, "__qualname__", repr(method))
+        return (
+            os.path.abspath(file_path),
+            os.stat(file_path).st_ctime_ns,
+            method,
+            repr(sorted(kwargs.items())),
+        )
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Copy of the cached data if present, otherwise load it and keep it in cache"""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy_data(self._entries[key][0])
+            self.misses += 1
+        data = load()
+        self.put(key, data)
+        return copy_data(data)
+
+    def put(self, key: Hashable, data: Any) -> None:
+        size = data_size(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (data, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            nbytes=self.nbytes,
+            max_bytes=self.max_bytes,
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+load_cache = LoadCache()
+
+
+class MetadataCache:
+    """
+    Process-wide LRU cache of parsed metadata files. An entry is valid while the size and modification time
+    of the files it was parsed from are unchanged
+    """
+
+    def __init__(self, max_entries: int = METADATA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[tuple, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(*file_paths: str) -> tuple:
+        """Size and modification time of each file, None for missing files"""
+        signature = []
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def get_or_parse(self, path: str, signature: tuple, parse: Callable[[], Any]) -> Any:
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                self._entries.move_to_end(path)
+                return entry[1]
+            self.misses += 1
+        parsed = parse()
+        with self._lock:
+            self._entries[path] = (signature, parsed)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+metadata_cache = MetadataCache()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import logging
+import warnings
+from typing import Any
+
+from stdflow import config
+
+logger = logging.getLogger(__name__)
+
+codecs = ["json", "orjson", "msgpack"]
+
+
+def _available(codec: str) -> bool:
+    try:
+        __import__(codec)
+    except ImportError:
+        return False
+    return True
+
+
+def resolve(codec: str | None = None) -> str:
+    """Codec to use: codec or the configured one if installed, json otherwise"""
+    codec = codec or config.METADATA_CODEC
+    if codec not in codecs:
+        raise ValueError(f"metadata codec {codec} not in {codecs}")
+    if codec != "json" and not _available(codec):
+        warnings.warn(f"{codec} is not installed. Metadata is encoded with json", category=UserWarning)
+        return "json"
+    return codec
+
+
+def _fast_json_dumps(obj: Any) -> bytes:
+    import orjson
+
+    try:
+        return orjson.dumps(obj)
+    except TypeError:  # non str keys, ... accepted by json
+        return json.dumps(obj).encode()
+
+
+def encode(obj: Any, codec: str | None = None) -> bytes:
+    codec = resolve(codec)
+    if codec == "msgpack":
+        import msgpack
+
+        return msgpack.packb(obj, use_bin_type=True)
+    if codec == "orjson":
+        return _fast_json_dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def decode(data: bytes) -> Any:
+    """Decode json or msgpack, detected from the first byte"""
+    if data.lstrip()[:1] in (b"{", b"["):
+        if _available("orjson"):
+            import orjson
+
+            return orjson.loads(data)
+        return json.loads(data)
+    import msgpack
+
+    return msgpack.unpackb(data, raw=False)
+
+
+def dumps_line(obj: Any) -> str:
+    """Single line json. Uses orjson when a fast codec is configured"""
+    if resolve() != "json" and _available("orjson"):
+        return _fast_json_dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def loads_line(line: str) -> Any:
+    if _available("orjson"):
+        import orjson
+
+        return orjson.loads(line)
+    return json.loads(line)
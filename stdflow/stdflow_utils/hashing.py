@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+import pandas as pd
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """Hash of the file content, read by blocks"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def hash_frame(data: pd.DataFrame) -> str | None:
+    """Hash of the values, index, column names and types of data. None if a column cannot be hashed"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in zip(data.columns, data.dtypes)]).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    except TypeError:  # lists, dicts, ...
+        return None
+    return h.hexdigest()
+
+
+def writer_identity(method: Any, kwargs: dict) -> str:
+    """Saver and its arguments, stable across processes. The same DataFrame gives different files for different ones"""
+    name = f"{getattr(method, '__module__', '')}.{getattr(method, '__qualname__', method)}"
+    return f"{name}({', '.join(f'{k}={v!r}' for k, v in sorted(kwargs.items()))})"
+
+
+def content_hash(data: Any = None, path: str | None = None, writer: str | None = None) -> str | None:
+    """
+    Identity of the content of a file: hash of the DataFrame and of the writer producing the file from it (see
+    writer_identity) if data is one, otherwise of the bytes of path.
+    Prefixed with what was hashed as both hashes differ for the same content
+    """
+    if isinstance(data, pd.DataFrame):
+        frame_hash = hash_frame(data)
+        if frame_hash is not None:
+            if writer is not None:
+                frame_hash = hashlib.blake2b(f"{frame_hash}{writer}".encode(), digest_size=16).hexdigest()
+            return f"frame:{frame_hash}"
+    if path is not None:
+        return f"file:{hash_file(path)}"
+    return None
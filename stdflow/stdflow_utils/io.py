@@ -1,4 +1,65 @@
+import os
 import pickle
+import shutil
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+@contextmanager
+def atomic_path(path, copy_existing=False):
+    """Temporary path in the directory of path, renamed to path once the block exits without error.
+    Readers never see a partially written file
+    :param copy_existing: start from a copy of the file at path, for writers appending to it"""
+    dir_path, name = os.path.split(path)
+    tmp_path = os.path.join(dir_path, f".~{uuid.uuid4().hex[:8]}.{name}")  # keeps the extension
+    if copy_existing and os.path.exists(path):
+        shutil.copy2(path, tmp_path)
+    try:
+        yield tmp_path
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+_FICLONE = 0x40049409  # linux ioctl sharing the blocks of a file with another (btrfs, xfs)
+
+
+def reflink(src, dst):
+    """Copy on write clone of src at dst. OSError if the platform or the file system does not support it"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflink not supported on this platform")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+def link_file(src, dst, method="auto") -> str:
+    """
+    Create dst sharing the content of src
+    :param method: "reflink", "hardlink" or "auto" (reflink, then hard link)
+    :return: method used. OSError if no method is supported
+    """
+    if method not in ["auto", "reflink", "hardlink"]:
+        raise ValueError(f"method must be one of auto, reflink, hardlink. Got {method}")
+    if method in ["auto", "reflink"]:
+        try:
+            reflink(src, dst)
+            return "reflink"
+        except OSError:
+            if method == "reflink":
+                raise
+    os.link(src, dst)
+    return "hardlink"
 
 
 def save_to_pkl(obj, filename):
@@ -11,3 +72,10 @@ def load_from_pkl(filename):
         obj = pickle.load(f)
     return obj
 
+
+def save_to_jsonl(df: pd.DataFrame, filename, **kwargs):
+    df.to_json(filename, orient="records", lines=True, **kwargs)
+
+
+def load_from_jsonl(filename, **kwargs):
+    return pd.read_json(filename, lines=True, **kwargs)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import uuid
+
+from stdflow.stdflow_utils.codec import decode, dumps_line, encode, loads_line
+from stdflow.stdflow_utils.io import atomic_path
+from stdflow.stdflow_utils.record_store import resolve_refs
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE_NAME = "metadata.jsonl"
+
+
+def journal_path(metadata_path: str) -> str:
+    """Journal next to the metadata.json file"""
+    return os.path.join(os.path.dirname(metadata_path), JOURNAL_FILE_NAME)
+
+
+def _record_path(record: dict) -> str:
+    return json.dumps([record["step"], record["file_name"], record["file_type"]], sort_keys=True)
+
+
+def merge_records(records: list[dict]) -> list[dict]:
+    """
+    Latest record of each file. A record replaces the previous ones with the same uuid, or the same path
+    (file saved again in place)
+    """
+    latest = {}
+    for record in records:
+        latest.pop(record["uuid"], None)
+        latest[record["uuid"]] = record
+    by_path = {}
+    for record in latest.values():
+        key = _record_path(record)
+        by_path.pop(key, None)
+        by_path[key] = record
+    return list(by_path.values())
+
+
+def append_records(metadata_path: str, records: list[dict]) -> None:
+    """Append records to the journal in a single write"""
+    if not records:
+        return
+    lines = "".join(dumps_line(record) + "\n" for record in records)
+    with open(journal_path(metadata_path), "a") as f:
+        f.write(lines)
+
+
+def _read_journal(path: str) -> list[dict]:
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(loads_line(line))
+            except ValueError:  # last line of an interrupted append
+                logger.warning(f"Ignoring corrupted record in {path}")
+    return records
+
+
+def _read_base(metadata_path: str) -> dict:
+    with open(metadata_path, "rb") as f:
+        return decode(f.read())
+
+
+def read_base(metadata_path: str) -> list[dict]:
+    """Records of metadata.json, in any metadata codec. Records referenced in the store of the root are resolved"""
+    base = _read_base(metadata_path)
+    return resolve_refs(base["files"], metadata_path, base.get("store"))
+
+
+def write_base(metadata_path: str, records: list[dict], store: str | None = None) -> None:
+    """
+    Write metadata.json with the configured metadata codec
+    :param store: path of the record store relative to the directory, if records contain references to it
+    """
+    content = dict(files=records)
+    if store is not None:
+        content["store"] = store
+    with atomic_path(metadata_path) as tmp_path, open(tmp_path, "wb") as f:
+        f.write(encode(content))
+
+
+def read_records(metadata_path: str) -> list[dict] | None:
+    """Records of metadata.json updated by the journal. None if there is neither of them"""
+    journal = journal_path(metadata_path)
+    has_base, has_journal = os.path.exists(metadata_path), os.path.exists(journal)
+    if not has_base and not has_journal:
+        return None
+    records = read_base(metadata_path) if has_base else []
+    if has_journal:
+        records += _read_journal(journal)
+    return merge_records(records)
+
+
+def set_journal_aside(metadata_path: str) -> str | None:
+    """
+    Move the journal to a temporary name, so appends made while it is folded go to a new journal instead of being lost
+    :return: temporary path of the journal, None if there is no journal
+    """
+    journal = journal_path(metadata_path)
+    aside = os.path.join(os.path.dirname(journal), f".~{uuid.uuid4().hex[:8]}.{JOURNAL_FILE_NAME}")
+    try:
+        os.replace(journal, aside)
+    except FileNotFoundError:
+        return None
+    return aside
+
+
+def read_journal_aside(metadata_path: str, aside: str | None) -> list[dict]:
+    """Records of metadata.json updated by the journal set aside"""
+    records = read_base(metadata_path) if os.path.exists(metadata_path) else []
+    if aside is not None:
+        records += _read_journal(aside)
+    return merge_records(records)
+
+
+def compact(metadata_path: str) -> None:
+    """Fold the journal into metadata.json, encoded with the configured metadata codec"""
+    journal = journal_path(metadata_path)
+    compacting = set_journal_aside(metadata_path)
+    if compacting is None:
+        return
+    base = _read_base(metadata_path) if os.path.exists(metadata_path) else dict(files=[])
+    store = base.get("store")
+    records = resolve_refs(base["files"], metadata_path, store)
+    records = merge_records(records + _read_journal(compacting))
+    if store is not None:  # records moved to the store stay references
+        referenced = {record["ref"] for record in base["files"] if "ref" in record}
+        records = [dict(ref=record["uuid"]) if record["uuid"] in referenced else record for record in records]
+    write_base(metadata_path, records, store)
+    os.remove(compacting)
+    logger.debug(f"Compacted {journal} into {metadata_path}")
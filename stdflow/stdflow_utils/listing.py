@@ -1,5 +1,9 @@
+from __future__ import annotations
+
+import fnmatch
 import os
 import re
+import threading
 
 
 def list_files_regex_all_depth(directory, pattern):
@@ -34,25 +38,83 @@ def list_files_regex(directory, pattern):
     return matched_files
 
 
+# directory: (modification time, sorted non hidden files, sorted non hidden sub directories)
+_listing_cache: dict[str, tuple[int, list[str], list[str]]] = {}
+_listing_lock = threading.Lock()
+
+
+def _listing(directory) -> tuple[list[str], list[str]]:
+    """
+    Non hidden files and sub directories of directory, listed in one os.scandir pass.
+    Cached until the modification time of directory changes or invalidate_listing(directory) is called
+    """
+    key = os.path.abspath(directory)
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return [], []
+    with _listing_lock:
+        cached = _listing_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    files, dirs = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.startswith("."):
+                (dirs if entry.is_dir() else files).append(entry.name)
+    files.sort()
+    dirs.sort()
+    with _listing_lock:
+        _listing_cache[key] = (mtime, files, dirs)
+    return files, dirs
+
+
+def invalidate_listing(directory) -> None:
+    with _listing_lock:
+        _listing_cache.pop(os.path.abspath(directory), None)
+
+
+def files_by_extension(directory) -> dict[str, list[str]]:
+    """Files of directory grouped by extension ("" for files without extension)"""
+    groups = {}
+    for file in _listing(directory)[0]:
+        groups.setdefault(file.rsplit(".", 1)[1] if "." in file else "", []).append(file)
+    return groups
+
+
 # using glob
 def list_files_glob(directory, pattern):
-    import glob
+    if pattern.startswith(".") or os.sep in pattern or (os.altsep and os.altsep in pattern):
+        import glob
 
-    paths = glob.glob(os.path.join(directory, pattern))
-    return [os.path.relpath(path, directory) for path in paths]
+        paths = glob.glob(os.path.join(directory, pattern))
+        return [os.path.relpath(path, directory) for path in paths]
+    # same matches as glob within a single directory, without hidden entries
+    files, dirs = _listing(directory)
+    return [name for name in files + dirs if fnmatch.fnmatchcase(name, pattern)]
 
 
 def list_excel_files(directory):
-    return list_files_glob(directory, "*.xlsx") + list_files_glob(directory, "*.xls")
+    groups = files_by_extension(directory)
+    return groups.get("xlsx", []) + groups.get("xls", [])
+
+
+# metadata file and its journal, never data files
+METADATA_FILE_NAMES = {"metadata.json", "metadata.jsonl"}
 
 
 def list_non_metadata_files(directory):
-    files = list_files_glob(directory, "*.*")
-    return list(set(files) - {"metadata.json"})
+    files = [f for f in _listing(directory)[0] if "." in f]
+    return [f for f in files if f not in METADATA_FILE_NAMES]
+
+
+def list_data_files_glob(directory, pattern):
+    """Files matching pattern, except the metadata files"""
+    return [f for f in list_files_glob(directory, pattern) if os.path.basename(f) not in METADATA_FILE_NAMES]
 
 
 def list_csv_files(directory):
-    return list_files_glob(directory, "*.csv")
+    return files_by_extension(directory).get("csv", [])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from stdflow.config import INDEX_DIR
+from stdflow.stdflow_utils.cache import metadata_cache
+from stdflow.stdflow_utils.codec import dumps_line, loads_line
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE_NAME = "records.jsonl"
+
+
+def store_path(root: str) -> str:
+    """Records shared by the metadata files of a data root"""
+    return os.path.join(root, INDEX_DIR, STORE_FILE_NAME)
+
+
+def read_store(path: str) -> dict[str, dict]:
+    """Records of the store by uuid. Parsed once per change of the store"""
+
+    def parse():
+        records = {}
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    record = loads_line(line)
+                    records[record["uuid"]] = record
+        return records
+
+    if not os.path.exists(path):
+        return {}
+    return metadata_cache.get_or_parse(path, metadata_cache.signature(path), parse)
+
+
+def add_to_store(path: str, records: list[dict]) -> int:
+    """
+    Append the records not yet in the store
+    :return: number of records added
+    """
+    known = read_store(path)
+    new = [record for record in records if record["uuid"] not in known]
+    if new:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(dumps_line(record) + "\n" for record in new))
+    return len(new)
+
+
+def resolve_refs(records: list[dict], metadata_path: str, store: str | None) -> list[dict]:
+    """Replace {"ref": uuid} entries by the records of the store, path relative to the metadata file"""
+    if store is None or not any("ref" in record for record in records):
+        return records
+    stored = read_store(os.path.join(os.path.dirname(metadata_path), store))
+    resolved = []
+    for record in records:
+        if "ref" not in record:
+            resolved.append(record)
+        elif record["ref"] in stored:
+            resolved.append(stored[record["ref"]])
+        else:
+            logger.warning(f"Record {record['ref']} referenced by {metadata_path} not found in the store {store}")
+    return resolved
+
+
+def _record_dir(record: dict) -> str:
+    from stdflow.stdflow_path import DataPath
+
+    path = DataPath.from_dict(record["step"], record["file_name"], record["file_type"])
+    return os.path.normpath(path.dir_path or ".")
+
+
+def compact_root(root: str) -> dict:
+    """
+    Move the records duplicated across the metadata files of root to the store of root.
+    Each metadata file keeps the records of its own files and of their direct inputs, and references to the others
+    :return: number of metadata files rewritten, records added to the store, size of the metadata before and after
+    """
+    from stdflow.stdflow_utils.journal import (
+        JOURNAL_FILE_NAME, journal_path, read_journal_aside, set_journal_aside, write_base
+    )
+
+    store = store_path(root)
+    summary = dict(metadata_files=0, records_stored=0, bytes_before=0, bytes_after=0)
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(d for d in dir_names if not d.startswith("."))
+        if "metadata.json" not in file_names and JOURNAL_FILE_NAME not in file_names:
+            continue
+        metadata_path = os.path.join(dir_path, "metadata.json")
+        journal = journal_path(metadata_path)
+        summary["bytes_before"] += sum(os.path.getsize(p) for p in [metadata_path, journal] if os.path.exists(p))
+
+        # appends made while compacting go to a new journal instead of being lost
+        aside = set_journal_aside(metadata_path)
+        records = read_journal_aside(metadata_path, aside)
+        local_dir = os.path.normpath(os.path.relpath(dir_path, root))
+        local = [record for record in records if _record_dir(record) == local_dir]
+        kept = {record["uuid"] for record in local} | {i["uuid"] for record in local for i in record["input_files"]}
+        summary["records_stored"] += add_to_store(store, [record for record in records if record["uuid"] not in kept])
+        write_base(
+            metadata_path,
+            [record if record["uuid"] in kept else dict(ref=record["uuid"]) for record in records],
+            os.path.relpath(store, dir_path),
+        )
+        if aside is not None:  # folded into metadata.json
+            os.remove(aside)
+
+        summary["metadata_files"] += 1
+        summary["bytes_after"] += os.path.getsize(metadata_path)
+    logger.info(f"Compacted metadata of {root}: {summary}")
+    return summary
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+from datetime import timedelta
+
+from stdflow.config import VERSION_PREFIX
+from stdflow.stdflow_utils import invalidate_folders
+from stdflow.stdflow_utils.journal import JOURNAL_FILE_NAME, read_records
+from stdflow.stdflow_utils.listing import invalidate_listing
+from stdflow.stdflow_utils.record_store import _record_dir
+from stdflow.stdflow_utils.versions import forget_versions, read_versions
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """
+    Versions of a step to keep. A version is kept if it is one of the keep_last most recent ones or if it was created
+    less than newer_than ago (all versions if neither is set), then the most recent kept versions totalling at most
+    max_bytes. The most recent version is always kept
+    """
+
+    def __init__(
+        self,
+        keep_last: int | None = None,
+        newer_than: timedelta | float | None = None,
+        max_bytes: int | None = None,
+    ):
+        """
+        :param keep_last: number of most recent versions to keep
+        :param newer_than: age under which versions are kept. timedelta or seconds
+        :param max_bytes: size budget of the versions of the step
+        """
+        if keep_last is not None and keep_last < 1:
+            raise ValueError(f"keep_last must be at least 1. Got {keep_last}")
+        if keep_last is None and newer_than is None and max_bytes is None:
+            raise ValueError("RetentionPolicy needs at least one of keep_last, newer_than, max_bytes")
+        self.keep_last = keep_last
+        self.newer_than = newer_than.total_seconds() if isinstance(newer_than, timedelta) else newer_than
+        self.max_bytes = max_bytes
+
+    def select(self, versions: list[dict], now: float | None = None) -> list[str]:
+        """
+        :param versions: versions with their name, creation time and size, oldest first
+        :return: names of the versions to delete
+        """
+        if not versions:
+            return []
+        now = time.time() if now is None else now
+        newest_first = versions[::-1]
+        if self.keep_last is None and self.newer_than is None:
+            kept = newest_first
+        else:
+            kept = [
+                v for i, v in enumerate(newest_first)
+                if (self.keep_last is not None and i < self.keep_last)
+                or (self.newer_than is not None and now - v["created"] < self.newer_than)
+            ]
+        if self.max_bytes is not None:
+            budget, kept_in_budget = self.max_bytes, []
+            for i, v in enumerate(kept):
+                if i > 0 and v["size"] > budget:
+                    break
+                budget -= v["size"]
+                kept_in_budget.append(v)
+            kept = kept_in_budget
+        kept_names = {v["version"] for v in kept} | {newest_first[0]["version"]}
+        return [v["version"] for v in versions if v["version"] not in kept_names]
+
+    def __repr__(self):
+        return f"RetentionPolicy(keep_last={self.keep_last}, newer_than={self.newer_than}, max_bytes={self.max_bytes})"
+
+
+def _dir_size(path: str, unique: bool = False) -> int:
+    """Size of the files under path. If unique, only the ones not hard linked elsewhere"""
+    size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            stat = os.lstat(os.path.join(dir_path, file_name))
+            if not unique or stat.st_nlink == 1:
+                size += stat.st_size
+    return size
+
+
+def step_versions(step_dir: str, sizes: bool = True) -> list[dict]:
+    """
+    Versions of the step on disk with their creation time and size (None if not sizes), oldest first.
+    Creation times come from the version index (exact), or the modification time of the directory if not indexed
+    """
+    indexed = {v["version"]: v for v in read_versions(step_dir) or []}
+    versions = []
+    with os.scandir(step_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.startswith(VERSION_PREFIX):
+                version = entry.name[len(VERSION_PREFIX):]
+                versions.append(
+                    dict(
+                        version=version,
+                        created=indexed[version]["created"] if version in indexed else entry.stat().st_mtime,
+                        exact=version in indexed and not indexed[version]["seeded"],
+                        size=_dir_size(entry.path) if sizes else None,
+                    )
+                )
+    return sorted(versions, key=lambda v: (v["created"], v["version"]))
+
+
+def _ancestor_dirs(metadata_dir: str, root: str) -> set[str]:
+    """Directories, relative to root, of the files the files of metadata_dir were generated from"""
+    records = read_records(os.path.join(metadata_dir, "metadata.json"))
+    by_uuid = {record["uuid"]: record for record in records}
+    local_dir = os.path.normpath(os.path.relpath(metadata_dir, root))
+    to_visit = [record for record in records if _record_dir(record) == local_dir]
+    seen, dirs = set(), set()
+    while to_visit:
+        record = to_visit.pop()
+        for input_file in record["input_files"]:
+            if input_file["uuid"] in seen or input_file["uuid"] not in by_uuid:
+                continue
+            seen.add(input_file["uuid"])
+            parent = by_uuid[input_file["uuid"]]
+            dirs.add(_record_dir(parent))
+            to_visit.append(parent)
+    return dirs
+
+
+def collect_garbage(
+    root: str, policy: RetentionPolicy, step_dirs: list[str] | None = None, dry_run: bool = False
+) -> dict:
+    """
+    Delete the versions of the steps of root not kept by policy, except those with files a kept file was generated
+    from (directly or not), according to the metadata files of root.
+    :param step_dirs: steps to apply the policy to. All the versioned steps of root by default
+    :param dry_run: only report what would be deleted
+    :return: deleted and protected version directories, bytes reclaimed
+    """
+    root = os.path.normpath(root)
+    metadata_dirs = None
+    if step_dirs is None:
+        step_dirs, metadata_dirs = _scan(root)
+    # version directory: (step directory, version name, creation time)
+    candidates = {}
+    for step_dir in map(os.path.normpath, step_dirs):
+        if not os.path.isdir(step_dir):
+            continue
+        versions = step_versions(step_dir, sizes=policy.max_bytes is not None)
+        # metadata modified before the creation of a version cannot list its files. 0 if not known exactly
+        created = {v["version"]: v["created"] if v["exact"] else 0 for v in versions}
+        for version in policy.select(versions):
+            candidates[os.path.join(step_dir, f"{VERSION_PREFIX}{version}")] = (step_dir, version, created[version])
+    summary = dict(deleted=[], protected=[], bytes_reclaimed=0)
+    if not candidates:
+        return summary
+    if metadata_dirs is None:
+        metadata_dirs = _scan(root)[1]
+
+    # versions kept, and the ones they come from, protect the versions they come from.
+    # Only metadata updated since the oldest candidate was created can list files of a candidate
+    oldest = min(created for _, _, created in candidates.values())
+    reachable = [d for d in metadata_dirs if _last_modified(d) >= oldest]
+    to_visit = [d for d in reachable if not any(_is_within(d, c) for c in candidates)]
+    protected = set()
+    while to_visit:
+        for ancestor_dir in _ancestor_dirs(to_visit.pop(), root):
+            ancestor_dir = os.path.normpath(os.path.join(root, ancestor_dir))
+            for candidate in candidates:
+                if candidate not in protected and _is_within(ancestor_dir, candidate):
+                    protected.add(candidate)
+                    to_visit += [d for d in reachable if _is_within(d, candidate)]
+
+    summary["protected"] = sorted(protected)
+    forgotten = {}
+    for candidate, (step_dir, version, _) in sorted(candidates.items()):
+        if candidate in protected:
+            logger.info(f"Keeping {candidate}: files of kept versions were generated from it")
+            continue
+        summary["bytes_reclaimed"] += _dir_size(candidate, unique=True)
+        summary["deleted"].append(candidate)
+        if not dry_run:
+            shutil.rmtree(candidate)
+            forgotten.setdefault(step_dir, []).append(version)
+    for step_dir, versions in forgotten.items():
+        forget_versions(step_dir, versions)
+        invalidate_folders(step_dir)
+        invalidate_listing(step_dir)
+    logger.info(
+        f"{'Would delete' if dry_run else 'Deleted'} {len(summary['deleted'])} versions of {root} "
+        f"({summary['bytes_reclaimed']} bytes), {len(protected)} kept for lineage"
+    )
+    return summary
+
+
+def _scan(root: str) -> tuple[list[str], list[str]]:
+    """Directories of root with versions, and with metadata files"""
+    step_dirs, metadata_dirs = [], []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(d for d in dir_names if not d.startswith("."))
+        if "metadata.json" in file_names or JOURNAL_FILE_NAME in file_names:
+            metadata_dirs.append(dir_path)
+        if any(d.startswith(VERSION_PREFIX) for d in dir_names):
+            step_dirs.append(dir_path)
+    return step_dirs, metadata_dirs
+
+
+def _last_modified(metadata_dir: str) -> float:
+    """Last modification time of the metadata files of the directory"""
+    paths = [os.path.join(metadata_dir, name) for name in ["metadata.json", JOURNAL_FILE_NAME]]
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0)
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory + os.sep)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stdflow.config import HLL_PRECISION
+from stdflow.stdflow_loaders.selection import normalize_filters
+
+logger = logging.getLogger(__name__)
+
+
+def hll_registers(series: pd.Series, precision: int = HLL_PRECISION) -> np.ndarray | None:
+    """HyperLogLog registers of the non null values of series. None if the values cannot be hashed"""
+    try:
+        hashes = pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy(dtype=np.uint64)
+    except TypeError:  # lists, dicts, ...
+        return None
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    if not len(hashes):
+        return registers
+    n_bits = 64 - precision
+    buckets = (hashes >> np.uint64(n_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << n_bits) - 1)
+    # rank of the first 1 bit of the remaining bits. rest < 2**53 is exact as a float
+    ranks = np.where(rest == 0, n_bits + 1, n_bits - np.floor(np.log2(np.maximum(rest, 1).astype(np.float64))))
+    np.maximum.at(registers, buckets, ranks.astype(np.uint8))
+    return registers
+
+
+def hll_estimate(registers: np.ndarray) -> int:
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:  # small cardinalities: linear counting
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return None
+
+
+class StatsAccumulator:
+    """Statistics of the columns of a DataFrame, updated chunk by chunk"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.n_rows = 0
+        self._columns: dict[str, dict] = {}
+        self._registers: dict[str, np.ndarray | None] = {}
+
+    def update(self, data: pd.DataFrame) -> None:
+        self.n_rows += len(data)
+        for name in data.columns:
+            series = data[name]
+            key = str(name)
+            column = self._columns.setdefault(key, dict(null_count=0, nbytes=0, min=None, max=None, ordered=True))
+            column["null_count"] += int(series.isna().sum())
+            column["nbytes"] += int(series.memory_usage(deep=True, index=False))
+            if column["ordered"]:
+                self._update_min_max(column, series)
+
+            registers = hll_registers(series, self.precision)
+            if key not in self._registers:
+                self._registers[key] = registers
+            elif self._registers[key] is not None:
+                self._registers[key] = None if registers is None else np.maximum(self._registers[key], registers)
+
+    @staticmethod
+    def _update_min_max(column: dict, series: pd.Series) -> None:
+        if isinstance(series.dtype, pd.CategoricalDtype) and not series.cat.ordered:
+            column["ordered"] = False
+            return
+        try:
+            low, high = series.min(), series.max()
+            if pd.isna(low):  # no value
+                return
+            column["min"] = low if column["min"] is None else min(column["min"], low)
+            column["max"] = high if column["max"] is None else max(column["max"], high)
+        except TypeError:  # mixed types
+            column["ordered"] = False
+            column["min"] = column["max"] = None
+
+    def result(self) -> dict:
+        columns = {}
+        for name, column in self._columns.items():
+            registers = self._registers.get(name)
+            columns[name] = dict(
+                null_count=column["null_count"],
+                distinct=hll_estimate(registers) if registers is not None else None,
+                min=_to_json(column["min"]),
+                max=_to_json(column["max"]),
+                nbytes=column["nbytes"],
+            )
+        return dict(
+            n_rows=self.n_rows,
+            nbytes=sum(column["nbytes"] for column in self._columns.values()),
+            columns=columns,
+        )
+
+
+def compute_stats(data: pd.DataFrame) -> dict:
+    """
+    Row count and, per column, null count, distinct count estimate, min, max and memory footprint
+    """
+    accumulator = StatsAccumulator()
+    accumulator.update(data)
+    return accumulator.result()
+
+
+def _comparable(bound: Any, value: Any) -> Any:
+    """Bound stored in json as a string compared to a date value"""
+    if isinstance(bound, str) and isinstance(value, (pd.Timestamp, datetime, date, np.datetime64)):
+        return pd.Timestamp(bound)
+    return bound
+
+
+def _may_match(column: dict | None, op: str, value: Any) -> bool:
+    if not column or column.get("min") is None or column.get("max") is None:
+        return True
+    low, high = column["min"], column["max"]
+    try:
+        if op in ["in", "not in"]:
+            if op == "not in":
+                return True
+            return any(_may_match(column, "==", v) for v in value)
+        low, high = _comparable(low, value), _comparable(high, value)
+        if op in ["=", "=="]:
+            return low <= value <= high
+        if op == "!=":
+            return not (low == high == value)
+        if op == "<":
+            return low < value
+        if op == "<=":
+            return low <= value
+        if op == ">":
+            return high > value
+        if op == ">=":
+            return high >= value
+    except TypeError:  # value of another type than the column
+        return True
+    return True
+
+
+def may_match(stats: dict | None, filters: list | None) -> bool:
+    """False if the min and max of the columns prove that no row of the file matches filters"""
+    if not stats or not filters:
+        return True
+    columns = stats.get("columns", {})
+    return any(
+        all(_may_match(columns.get(str(col)), op, value) for col, op, value in conjunction)
+        for conjunction in normalize_filters(filters)
+    )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+
+from stdflow.config import VERSION_PREFIX
+from stdflow.stdflow_utils import detect_folders
+from stdflow.stdflow_utils.cache import metadata_cache
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_FILE_NAME = ".versions"
+
+
+def versions_path(step_dir: str) -> str:
+    return os.path.join(step_dir, VERSIONS_FILE_NAME)
+
+
+def record_version(step_dir: str, version: str, file_name: str) -> None:
+    """
+    Append a file saved in version to the version index of the step.
+    The index is created with the versions already in the directory, in name order
+    """
+    path = versions_path(step_dir)
+    lines = []
+    if not os.path.exists(path):
+        for existing in detect_folders(step_dir, VERSION_PREFIX):
+            if existing != version:
+                created = os.stat(os.path.join(step_dir, f"{VERSION_PREFIX}{existing}")).st_mtime
+                lines.append(dict(version=existing, created=created, file=None))
+    lines.append(dict(version=version, created=time.time(), file=file_name))
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(line) + "\n" for line in lines))
+
+
+def read_versions(step_dir: str) -> list[dict] | None:
+    """
+    Versions of the step in creation order, each with its name, creation time and files.
+    seeded versions existed before the index: their creation time is the modification time of their directory when
+    the index was created. None if the step has no version index
+    """
+    path = versions_path(step_dir)
+
+    def parse():
+        versions = {}
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    line = json.loads(line)
+                except ValueError:  # interrupted append
+                    continue
+                # a version is created by its first save
+                version = versions.setdefault(
+                    line["version"],
+                    dict(version=line["version"], created=line["created"], files=[], seeded=line["file"] is None),
+                )
+                if line["file"] is not None and line["file"] not in version["files"]:
+                    version["files"].append(line["file"])
+        return sorted(versions.values(), key=lambda v: v["created"])
+
+    if not os.path.exists(path):
+        return None
+    return metadata_cache.get_or_parse(path, metadata_cache.signature(path), parse)
+
+
+def ordered_versions(step_dir: str) -> list[str]:
+    """
+    Versions on disk of the step, oldest first. With a version index, by creation time: from the index, or the
+    modification time of the directory for versions not in it (copied directory, ...). Without index, by name.
+    The index alone is read while it is more recent than the step directory: creating or deleting a version
+    directory updates the modification time of the step directory
+    """
+    indexed = read_versions(step_dir)
+    if indexed is None:
+        return detect_folders(step_dir, VERSION_PREFIX)
+    try:
+        if os.stat(step_dir).st_mtime_ns <= os.stat(versions_path(step_dir)).st_mtime_ns:
+            return [v["version"] for v in indexed]
+    except FileNotFoundError:
+        return []
+    created = {v["version"]: v["created"] for v in indexed}
+    on_disk = []
+    for version in detect_folders(step_dir, VERSION_PREFIX):
+        if version not in created:
+            created[version] = os.stat(os.path.join(step_dir, f"{VERSION_PREFIX}{version}")).st_mtime
+        on_disk.append(version)
+    return sorted(on_disk, key=lambda v: (created[v], v))
+
+
+def find_version(step_dir: str, version_type: str) -> str | None:
+    """Last (":last") or first (":first") version of the step, in the order of ordered_versions"""
+    versions = ordered_versions(step_dir)
+    if not versions:
+        return None
+    return versions[-1] if version_type == ":last" else versions[0]
+
+
+def forget_versions(step_dir: str, versions: list[str]) -> None:
+    """Remove deleted versions from the version index of the step"""
+    path = versions_path(step_dir)
+    if not os.path.exists(path):
+        return
+    versions = set(versions)
+    with open(path, "r") as f:
+        lines = [line for line in f if line.strip()]
+    kept = []
+    for line in lines:
+        try:
+            if json.loads(line)["version"] in versions:
+                continue
+        except ValueError:  # interrupted append
+            continue
+        kept.append(line)
+    with open(path, "w") as f:
+        f.write("".join(kept))
+    metadata_cache.invalidate(path)
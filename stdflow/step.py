@@ -10,8 +10,14 @@ __all__ = ['logger', 'loaders', 'savers', 'GStep', 'Step']
 # %% ../nbs/02_step.ipynb 4
 import json
 import logging
+import asyncio
+import functools
 import os
+import sqlite3
+import threading
 import warnings
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
 # isort: off
@@ -26,7 +32,32 @@ from stdflow.stdflow_doc.documenter import (
     NO_DETAILS,
 )
 from .stdflow_utils.caller_metadata import get_caller_metadata, get_notebook_path
-from .stdflow_utils.io import load_from_pkl, save_to_pkl
+from .stdflow_utils.background import background_writer
+from .stdflow_utils.cache import copy_data, load_cache, metadata_cache
+from .stdflow_utils.hashing import content_hash as get_content_hash, writer_identity
+from .stdflow_utils.versions import ordered_versions, record_version
+from .stdflow_utils.retention import RetentionPolicy, collect_garbage
+from .stdflow_utils.stats import StatsAccumulator, compute_stats, may_match
+from stdflow.stdflow_utils.journal import (
+    append_records,
+    compact as compact_metadata,
+    journal_path,
+    read_records,
+    set_journal_aside,
+    write_base,
+)
+from .stdflow_utils.listing import invalidate_listing
+from .stdflow_utils.io import atomic_path, link_file, load_from_pkl, save_to_pkl, load_from_jsonl, save_to_jsonl
+from .stdflow_loaders.arrow import load_arrow, save_to_arrow
+from stdflow.stdflow_loaders.compression import (
+    auto_compression,
+    describe as describe_compression,
+    recorded_compression,
+    sniff_compression,
+)
+from .stdflow_loaders.selection import load_selection, merge_selections, projection_kwargs, select_frame, selection_to_dict
+from .stdflow_loaders.shadow import load_with_shadow, shadow_key
+from .stdflow_loaders.stream import chunk_loaders, chunk_savers, read_schema, peek, ChunkTracker
 
 # isort: on
 
@@ -39,13 +70,19 @@ from types import ModuleType
 
 import pandas as pd
 
-from .config import DEFAULT_DATE_VERSION_FORMAT, INFER
-from .filemetadata import FileMetaData, get_file, get_file_md
+from . import config  # switches read when used: LINEAGE_INDEX, DEDUP_LINK
+from stdflow.config import (
+    COMPRESSION_POLICY, DEFAULT_DATE_VERSION_FORMAT, INFER, METADATA_JOURNAL_MAX_BYTES,
+    VERSION_PREFIX,
+)
+from .filemetadata import FileMetaData, FileMetaDataList, get_file, get_file_md
+from .stdflow_index import LineageIndex, index_path
 from .stdflow_path import DataPath
 from .stdflow_types.strftime_type import Strftime
-from .stdflow_utils import export_viz_html, get_arg_value, string_to_uuid
+from .stdflow_utils import export_viz_html, get_arg_value, invalidate_folders, string_to_uuid
 
 from .stdflow_utils.list_op import filter_list, nested_replace, flatten, alias_from_file_metadata
+from .stdflow_utils.listing import list_data_files_glob
 
 
 # %% ../nbs/02_step.ipynb 5
@@ -62,13 +99,15 @@ loaders = dict(
     xls=pd.read_excel,
     parquet=pd.read_parquet,
     json=pd.read_json,
+    jsonl=load_from_jsonl,
     pickle=pd.read_pickle,
     feather=pd.read_feather,
+    arrow=load_arrow,
     hdf=pd.read_hdf,
     sql=pd.read_sql,
     pkl=load_from_pkl,
 )
-# full list: [csv, excel, xlsx, xls, parquet, json, pickle, feather, hdf, sql, pkl]
+# full list: [csv, excel, xlsx, xls, parquet, json, jsonl, pickle, feather, arrow, hdf, sql, pkl]
 
 # %% ../nbs/02_step.ipynb 7
 savers = dict(
@@ -78,14 +117,21 @@ savers = dict(
     xls=pd.DataFrame.to_excel,
     parquet=pd.DataFrame.to_parquet,
     json=pd.DataFrame.to_json,
+    jsonl=save_to_jsonl,
     pickle=pd.DataFrame.to_pickle,
     feather=pd.DataFrame.to_feather,
+    arrow=save_to_arrow,
     hdf=pd.DataFrame.to_hdf,
     sql=pd.DataFrame.to_sql,
     pkl=save_to_pkl,
 )
 
 # %% ../nbs/02_step.ipynb 8
+def _loaded_columns(md: FileMetaData, columns: list[str] | None = None) -> list[str]:
+    """Columns of the file loaded, restricted to the projected columns if any"""
+    return [c["name"] for c in md.columns if columns is None or c["name"] in columns]
+
+
 class GStep:
     """Singleton Step used at package level"""
 
@@ -106,18 +152,19 @@ class Step(ModuleType):
         attrs: str | list[str] | None = None, # Default attributes part of the path
         version: str | None = ":default", # Default version name (cannot use :last or other custom variables)
         file_name: str | None = ":auto", # Specify the file name. See file_name_in and file_name_out for more details on :auto behaviour 
-        method_in: str | object | None = ":auto", # Default method to load the data.  # Method to load the data. Can be a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, pickle, feather, hdf, sql, pkl].
+        method_in: str | object | None = ":auto", # Default method to load the data.  # Method to load the data. Can be a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, jsonl, pickle, feather, arrow, hdf, sql, pkl].
         root_in: str | None = ":default", # Default root folder when loading [not recommended, use root instead]
         attrs_in: str | list[str] | None = ":default", # Default attributes when loading
         step_in: str | None = None, # Default step name when loading
         version_in: str | None = ":default", # Default version name when loading
         file_name_in: str | None = ":default", # Default file name when loading
-        method_out: str | object | None = ":auto", # Default method to save the data. Can a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, pickle, feather, hdf, sql, pkl] 
+        method_out: str | object | None = ":auto", # Default method to save the data. Can a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, jsonl, pickle, feather, arrow, hdf, sql, pkl] 
         root_out: str | None = ":default", # Default root folder when saving [not recommended, use root instead]
         attrs_out: str | list[str] | None = ":default", # Default attributes when saving
         step_out: str | None = None, # Default step name when saving
         version_out: str | None = ":default", # Default version name when saving
         file_name_out: str | None = ":default", # Default file name when saving
+        retention: RetentionPolicy | None = None, # Default retention policy applied to the versions of the step after saving
         md_all_files: list[FileMetaData] = None, # Internal. Do not use
         md_direct_input_files: list[FileMetaData] = None, # Internal. Do not use
     ):
@@ -136,12 +183,16 @@ class Step(ModuleType):
 
         # === Exported === #
         # all inputs to this step
-        self.md_all_files: list[FileMetaData] = md_all_files if md_all_files is not None else []
+        self.md_all_files: FileMetaDataList = md_all_files if md_all_files is not None else []
         # direct input to this step
-        self.md_direct_input_files: list[FileMetaData] = (
+        self.md_direct_input_files: FileMetaDataList = (
             md_direct_input_files if md_direct_input_files is not None else []
         )
         # ================ #
+        # subset of the direct input files loaded, by uuid. absent if the whole file was loaded
+        self._input_selections: dict[str, dict] = {}
+        # metadata file path: md_all_files.last_change when this step last wrote it
+        self._journaled: dict[str, int] = {}
 
         # Default values of load and save functions
         self._method_in = method_in
@@ -162,10 +213,14 @@ class Step(ModuleType):
         self._version = version
         self._attrs = attrs
         self._file_name = file_name
+        self._retention = retention
 
         # Used when actually using the step to save the variables set
         self._var_set = {}
 
+        # Guards the metadata bookkeeping when loading / saving from several threads (aload, asave)
+        self._lock = threading.RLock()
+
         self.doc = Documenter()
 
     def set_defaults(  # TODO some are not implemented
@@ -187,6 +242,7 @@ class Step(ModuleType):
         step_out: str | None = None,
         version_out: str | None = DEFAULT_DATE_VERSION_FORMAT,
         file_name_out: str | None = ":default",
+        retention: RetentionPolicy | None = None,
     ):
         self._root = root
         self._attrs = attrs
@@ -206,6 +262,7 @@ class Step(ModuleType):
         self._step_out = step_out
         self._version_out = version_out
         self._file_name_out = file_name_out
+        self._retention = retention
 
     def var(self, key, value, force=False):
         "Set a variable which can be overwritten if specified in StepRunner / Pipeline"
@@ -312,12 +369,20 @@ class Step(ModuleType):
         root: str | Literal[":default"] = ":default", # Root folder of the data. Not exported in metadata
         attrs: list | str | None | Literal[":default"] = ":default", # Attributes part of the path
         step: str | None | Literal[":default"] = ":default", # Step name, converted to step_{step_name} in the path
-        version: str | None | Literal[":default", ":last", ":first"] = ":default", # Version name, converted to v_{version_name} in the path. if :default, uses :last, if :last uses last version based on its name. if :first, uses first version based on its name
+        version: str | None | Literal[":default", ":last", ":first"] = ":default", # Version name, converted to v_{version_name} in the path. if :default, uses :last. :last and :first use the last and first version by creation time, from the version index of the step (by name for steps without index)
         file_name: str | Literal[":default", ":auto"] = ":default", # File name. automatically inferred if there is only one file in the directory
-        method: str | object | Literal[":default", ":auto"] = ":default", # Method to load the data. Can be a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, pickle, feather, hdf, sql, pkl].
+        method: str | object | Literal[":default", ":auto"] = ":default", # Method to load the data. Can be a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, jsonl, pickle, feather, arrow, hdf, sql, pkl].
         alias: str = ":ignore", # Alias of the dataset to document it and its columns. (feature in development)
         file_glob: bool = False, # If True, file_name can be a glob pattern
         verbose: bool = False, # If True, print info messages
+        chunksize: int | None = None, # If set, returns an iterator of DataFrames of chunksize rows. Supported for csv, parquet and jsonl
+        stream: bool = False, # If True, returns an iterator of DataFrames (parquet row groups or chunks of DEFAULT_CHUNKSIZE rows)
+        columns: list[str] | None = None, # Columns to load. Pushed down to the reader for parquet, feather, arrow and csv
+        filters: list | None = None, # Rows to load, in pyarrow DNF format [(col, op, value), ...]. Pushed down to the reader for parquet, feather and arrow
+        cache: bool = False, # If True, keep the loaded data in the process-wide LRU cache (stdflow.load_cache) and return a copy
+        shadow: bool = False, # If True, keep a hidden parquet copy of slow formats (csv, excel, ...) and load it while the file is unchanged
+        combine: Literal["concat", "dict"] | None = None, # If set, file_name is a glob pattern and all matching files are loaded concurrently then concatenated or returned as a dict {file name: data}
+        max_workers: int | None = None, # Number of threads used to load files when combine is set
         **kwargs, # Parameters for the loading funtion
     ) -> Tuple[Any, dict] | Any: # Loaded data
         """
@@ -354,15 +419,140 @@ class Step(ModuleType):
         # if root is not None:
         #     root = self.env.get_adjusted_worker_path(root)
 
+        if combine is not None:
+            path: DataPath = DataPath.from_input_params(root, attrs, step, version, None)
+            return self._load_files(
+                path, file_name, method, alias, combine, max_workers, verbose,
+                columns=columns, filters=filters, cache=cache, shadow=shadow, **kwargs
+            )
+
         path: DataPath = DataPath.from_input_params(
             root, attrs, step, version, file_name, glob=file_glob
         )
         if not path.file_name:
             raise ValueError(f"file_name is None. path: {path}")
 
+        previous_step = Step._from_path(path)
+        data, schema = self._read_file(
+            path, method, verbose, chunksize=chunksize, stream=stream, columns=columns, filters=filters,
+            cache=cache, shadow=shadow, file_md=previous_step and get_file_md(previous_step.md_all_files, path),
+            **kwargs
+        )
+
+        # Add metadata
+        file_md, input_files = self._input_file_metadata(path, data, schema, previous_step, alias, columns)
+        with self._lock:
+            self._add_input_files([(file_md, input_files)], selection_to_dict(columns, filters))
+
+            # Update documentation
+            if alias != ":ignore":
+                alias = alias or alias_from_file_metadata(file_md)
+
+                self.doc.set_dataframe(
+                    columns=_loaded_columns(file_md, columns),
+                    col_steps=file_md.col_steps,
+                    alias=alias,
+                )
+
+        # logger.setLevel(original_logger_level)
+        return data
+
+    def _load_files(
+        self,
+        path: DataPath,
+        pattern: str,
+        method: str | object,
+        alias: str,
+        combine: Literal["concat", "dict"],
+        max_workers: int | None,
+        verbose: bool,
+        columns: list[str] | None = None,
+        filters: list | None = None,
+        **kwargs,
+    ) -> pd.DataFrame | dict:
+        """Load concurrently all files of the directory of path matching the glob pattern"""
+        if combine not in ["concat", "dict"]:
+            raise ValueError(f"combine must be one of ['concat', 'dict'], got {combine}")
+        file_names = sorted(list_data_files_glob(path.dir_path, pattern))
+        if not file_names:
+            raise ValueError(f"No file matching {pattern} in {path.dir_path}")
+        paths = [
+            DataPath(root=path.root, attrs=path.attrs, step_name=path.step_name, version=path.version, file_name=f)
+            for f in file_names
+        ]
+        # all files share the same metadata file: parsed once and registered in one update
+        previous_step: Step = Step._from_path(path)
+
+        if filters and previous_step is not None:
+            # skip files whose column statistics prove that no row matches. They are not inputs of the step
+            matching = [
+                p for p in paths if may_match(getattr(get_file_md(previous_step.md_all_files, p), "stats", None), filters)
+            ]
+            logger.info(f"{len(paths) - len(matching)} files skipped out of {len(paths)} from their statistics")
+            paths = matching or paths[:1]  # one file read to get the columns of the empty result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(
+                executor.map(
+                    lambda p: self._read_file(
+                        p, method, verbose, columns=columns, filters=filters,
+                        file_md=previous_step and get_file_md(previous_step.md_all_files, p), **kwargs
+                    ),
+                    paths,
+                )
+            )
+
+        files = [
+            self._input_file_metadata(p, data, schema, previous_step, alias, columns)
+            for p, (data, schema) in zip(paths, loaded)
+        ]
+        with self._lock:
+            self._add_input_files(files, selection_to_dict(columns, filters))
+
+            if alias != ":ignore":
+                file_md = files[0][0]
+                self.doc.set_dataframe(
+                    columns=_loaded_columns(file_md, columns),
+                    col_steps=file_md.col_steps,
+                    alias=alias or alias_from_file_metadata(file_md),
+                )
+
+        if combine == "concat":
+            return pd.concat([data for data, _ in loaded], ignore_index=True)
+        return {p.file_name_no_ext: data for p, (data, _) in zip(paths, loaded)}
+
+    def _read_file(
+        self,
+        path: DataPath,
+        method: str | object,
+        verbose: bool = False,
+        chunksize: int | None = None,
+        stream: bool = False,
+        columns: list[str] | None = None,
+        filters: list | None = None,
+        cache: bool = False,
+        shadow: bool = False,
+        file_md: FileMetaData | None = None,
+        **kwargs,
+    ) -> tuple[Any, Any]:
+        """
+        :param file_md: metadata recorded when the file was saved, if any
+        :return: data loaded, data describing the whole file used for its metadata (the file schema if only
+        a part of it is loaded)
+        """
         if method == ":auto":
             method = path.extension
-        if isinstance(method, str):
+        method_name = method if isinstance(method, str) else None
+        selection = selection_to_dict(columns, filters)
+        streaming = stream or chunksize is not None
+        if method_name in ["csv", "json", "jsonl", "pickle"] and "compression" not in kwargs:
+            # compressed files keep the extension of their format: codec recorded when saved, or found from the file
+            codec = recorded_compression(file_md and file_md.export_method_used) or sniff_compression(path.full_path)
+            if codec not in [None, "none"]:
+                kwargs["compression"] = codec
+        if streaming and method not in chunk_loaders:
+            raise ValueError(f"method {method} cannot be streamed. Use one of {list(chunk_loaders.keys())}")
+        if isinstance(method, str) and not streaming:
             if method not in loaders:
                 raise ValueError(f"method {method} not in {list(loaders.keys())}")
             method = loaders[method]
@@ -371,19 +561,65 @@ class Step(ModuleType):
         if verbose:
             print(f"Loading data from {path.full_path}")
         logger.info(f"Loading data from {path.full_path}")
-        data = method(path.full_path, **kwargs)
-        logger.info(f"Data loaded from {path.full_path}")
+        if streaming:
+            data = chunk_loaders[method](
+                path.full_path, chunksize=chunksize, **projection_kwargs(method, columns, filters), **kwargs
+            )
+            if selection is not None:
+                data = (select_frame(chunk, columns, filters) for chunk in data)
+            # schema from the file footer if any, otherwise from the first chunk
+            schema = read_schema(path.full_path, method)
+            if schema is None:
+                schema, data = peek(data)
+        else:
+            def read():
+                if shadow:
+                    return load_with_shadow(
+                        path.full_path,
+                        lambda: method(path.full_path, **kwargs),
+                        shadow_key(method_name or method, kwargs),
+                        columns,
+                        filters,
+                    )
+                if selection is not None:
+                    return load_selection(method_name, method, path.full_path, columns, filters, **kwargs)
+                return method(path.full_path, **kwargs)
 
-        # Add metadata
-        previous_step: Step = Step._from_path(path)
+            if cache:
+                key = load_cache.key(path.full_path, method_name or method, columns=columns, filters=filters, **kwargs)
+                data = load_cache.get_or_load(key, read)
+            else:
+                data = read()
+            # the metadata describe the whole file, not the subset loaded
+            schema = read_schema(path.full_path, method_name) if selection is not None else None
+            if schema is None:
+                schema = data
+        logger.info(f"Data loaded from {path.full_path}")
+        return data, schema
+
+    @staticmethod
+    def _input_file_metadata(
+        path: DataPath,
+        data: Any,
+        schema: Any,
+        previous_step: Step | None,
+        alias: str,
+        columns: list[str] | None = None,
+    ) -> tuple[FileMetaData, list[FileMetaData]]:
+        """
+        :param previous_step: step read from the metadata file of the directory of path, if any
+        :return: metadata of the loaded file, metadata of all files needed to generate it (including itself)
+        """
 
         def fake_step():
             previous_step_ = Step()
-            previous_step_.md_all_files = [FileMetaData.from_data(path, data)]
+            previous_step_.md_all_files = [
+                FileMetaData.from_data(path, schema, n_rows=INFER if schema is data else None)
+            ]
             if alias != ":ignore":
                 for md in previous_step_.md_all_files:
                     previous_step_.doc.set_dataframe(
-                        columns=[c["name"] for c in md.columns],
+                        columns=_loaded_columns(md, columns),
                         col_steps=md.col_steps,
                         alias="tmp",
                     )
@@ -411,45 +647,56 @@ class Step(ModuleType):
         if input_files is None:
             previous_step = fake_step()
             file_md, input_files = update_current_step_with_previous_step(previous_step)
+        return file_md, input_files
 
+    def _add_input_files(
+        self, files: list[tuple[FileMetaData, list[FileMetaData]]], selection: dict | None = None
+    ) -> None:
+        """
+        Register loaded files and the files needed to generate them
+        :param files: (metadata of the loaded file, metadata of all files needed to generate it) for each file loaded
+        :param selection: subset of the files loaded, None if loaded entirely
+        """
         # do not add the same file twice in self.data_l
         # 1. Keep the file one if same uuid
         # 2. Add if same path but different uuid: same file twice but with different timestamps (error from the dev)
-        for input_file in input_files:
-            if input_file not in [f for f in self.md_all_files]:  # file already added: same uuid
-                self.md_all_files.append(input_file)
+        # (appending a file with a uuid already present is a no-op)
+        for _, input_files in files:
+            self.md_all_files.extend(input_files)
 
         # file loaded
-        if file_md not in [f for f in self.md_direct_input_files]:  # file already added: same uuid
-            self.md_direct_input_files.append(file_md)
-
-        # Update documentation
-        if alias != ":ignore":
-            alias = alias or alias_from_file_metadata(file_md)
-
-            self.doc.set_dataframe(
-                columns=[c["name"] for c in file_md.columns],
-                col_steps=file_md.col_steps,
-                alias=alias,
-            )
-
-        # logger.setLevel(original_logger_level)
-        return data
+        for file_md, _ in files:
+            if file_md not in self.md_direct_input_files:  # file already added: same uuid
+                self.md_direct_input_files.append(file_md)
+                if selection is not None:
+                    self._input_selections[file_md.uuid] = selection
+            elif file_md.uuid in self._input_selections:  # loaded again: the subset used covers both loads
+                merged = merge_selections(self._input_selections[file_md.uuid], selection)
+                if merged is None:
+                    del self._input_selections[file_md.uuid]
+                else:
+                    self._input_selections[file_md.uuid] = merged
 
     def save(
         self, 
-        data: pd.DataFrame | Any, # data to save
+        data: pd.DataFrame | Iterator[pd.DataFrame] | Any, # data to save. An iterator of DataFrames is written chunk by chunk (csv, parquet, jsonl)
         root: str | Literal[":default"] = ":default", # Root folder of the data. Not exported in metadata
         attrs: list | str | None | Literal[":default"] = ":default", # Attributes part of the path
         step: str | None | Literal[":default"] = ":default", # Step name, converted to step_{step_name} in the path
         version: str | None | Literal[":default"] | Strftime = ":default", # Version name, converted to v_{version_name} in the path. by default uses the current date in format %Y%m%d%H%M
         file_name: str | Literal[":default", ":auto"] = ":default", # File name. automatically inferred if there is only one input file 
-        method: str | object | Literal[":default", ":auto"] = ":default", # Method to save the data. Can a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, pickle, feather, hdf, sql, pkl]. If function, the first argument must be the path
+        method: str | object | Literal[":default", ":auto"] = ":default", # Method to save the data. Can a function with path as first argument or a string among [csv, excel, xlsx, xls, parquet, json, jsonl, pickle, feather, arrow, hdf, sql, pkl]. If function, the first argument must be the path
         alias: str = ":ignore", # Alias of the dataset to document it and its columns. (feature in development)
         export_viz_tool: bool = False, # If True, export html view of the data and the pipeline it comes from
         verbose: bool = False, # If True, print info messages
-        **kwargs, # Parameters for the exporting funtion (e.g. index=False for to_csv)
-    ) -> DataPath: # Path object describing where the data is saved
+        background: bool = False, # If True, write a snapshot of data in a background thread and return a Future resolving to the path. Wait for all writes with flush()
+        stats: bool = False, # If True, store statistics of the columns (nulls, distinct count estimate, min, max, memory) in the metadata
+        content_hash: bool = False, # If True, store a hash of the content in the metadata (of the DataFrame, or of the file written for other data)
+        skip_if_unchanged: bool = False, # If True, reuse the file saved at path, or in the last version of the step, if it has the same content and input files instead of writing it again. Implies content_hash
+        retention: RetentionPolicy | None | Literal[":default"] = ":default", # Versions of the step to keep after saving. Older versions are deleted, except the ones kept files were generated from
+        dedup: bool = False, # If True, link the file to the one of the previous version of the step instead of keeping a copy when their bytes are identical (reflink or hard link, see DEDUP_LINK)
+        **kwargs, # Parameters for the exporting funtion (e.g. index=False for to_csv). compression=":auto" picks the codec from a sample of data, according to compression_policy ("speed", "balanced", "size")
+    ) -> DataPath | Future: # Path object describing where the data is saved
         """
         Save data with path such as
         root/attrs/step/version/file_name
@@ -464,6 +711,7 @@ class Step(ModuleType):
         version = get_arg_value(get_arg_value(get_arg_value(version, self._version_out), self._version), DEFAULT_DATE_VERSION_FORMAT)
         file = get_arg_value(get_arg_value(file_name, self._file_name_out), self._file_name)
         method = get_arg_value(method, self._method_out)
+        retention = get_arg_value(retention, self._retention)
         
         if version in [":last", ":first"]:
             raise ValueError(f"version cannot be {version} on saving. Use a string, \":default\" or a strftime format")
@@ -500,47 +748,252 @@ class Step(ModuleType):
         if not path.file_name:
             raise ValueError(f"file_name is None. path: {path}")
 
-        # if the directory does not exist, create it recursively
-        if not os.path.exists(path.dir_path):
-            os.makedirs(path.dir_path)
-
         if method == ":auto":
             method = path.extension
-        if isinstance(method, str):
+        method_name = method if isinstance(method, str) else None
+        streaming = isinstance(data, Iterator)
+        if streaming:
+            if method not in chunk_savers:
+                raise ValueError(f"method {method} cannot save chunks. Use one of {list(chunk_savers.keys())}")
+            method = chunk_savers[method]
+        elif isinstance(method, str):
             if method not in savers:
                 raise ValueError(f"method {method} not in {list(savers.keys())}")
             method = savers[method]
 
+        if kwargs.get("compression") == ":auto":
+            if method_name is None or (streaming and method_name not in ["csv", "parquet"]):
+                raise ValueError(f'compression=":auto" not supported for method {method_name or method}')
+            sample = data
+            if streaming:
+                sample, data = peek(data)
+            kwargs.update(auto_compression(sample, method_name, kwargs.pop("compression_policy", COMPRESSION_POLICY)))
+
+        # inputs are the ones loaded at the time of the call, even if the write happens later
+        input_files = list(self.md_direct_input_files)
+        input_selections = dict(self._input_selections)
+        if background:
+            col_steps = ":auto"
+            if not streaming:
+                data = copy_data(data)  # later changes to data are not saved
+                # nor columns documented after the call
+                col_steps = self._col_steps(alias, data, path)
+            return background_writer.submit(
+                self._write, data, path, method, alias, export_viz_tool, verbose,
+                input_files, input_selections, stats, content_hash or skip_if_unchanged, skip_if_unchanged, retention,
+                dedup, col_steps, **kwargs
+            )
+        return self._write(
+            data, path, method, alias, export_viz_tool, verbose, input_files, input_selections,
+            stats, content_hash or skip_if_unchanged, skip_if_unchanged, retention, dedup, **kwargs
+        )
+
+    def _write(
+        self,
+        data: pd.DataFrame | Iterator[pd.DataFrame] | Any,
+        path: DataPath,
+        method: object,
+        alias: str,
+        export_viz_tool: bool,
+        verbose: bool,
+        input_files: list[FileMetaData],
+        input_selections: dict[str, dict],
+        stats: bool,
+        content_hash: bool,
+        skip_if_unchanged: bool,
+        retention: RetentionPolicy | None,
+        dedup: bool,
+        col_steps: list[dict] | Literal[":auto"] = ":auto",
+        **kwargs,
+    ) -> DataPath:
+        """
+        Write data to a temporary file renamed to path once complete, then update the metadata file
+        :param col_steps: documentation of the columns. :auto to take it from the documentation of the step when written
+        """
+        streaming = isinstance(data, Iterator)
+
+        # DataFrames are hashed before writing, with the saver and its arguments. Other data from the file written
+        file_hash = None
+        if content_hash and not streaming:
+            file_hash = get_content_hash(data, writer=writer_identity(method, kwargs))
+        if skip_if_unchanged and file_hash is not None:
+            existing = self._unchanged_file(path, file_hash, input_files)
+            if existing is not None:
+                return self._reuse_file(existing, path)
+
+        method_used = method.__str__()
+        if "compression" in kwargs:
+            method_used += f" compression={describe_compression(kwargs)}"
+
         # Save data
         if verbose:
             print(f"Saving data to {path.full_path}")
         logger.info(f"Saving data to {path.full_path}")
-        method(data, path.full_path, **kwargs)
+        # if the directory does not exist, create it recursively
+        os.makedirs(path.dir_path, exist_ok=True)
+        invalidate_folders(path.step_dir)  # new version visible to :last
+        # writers appending to the file (mode="a", to_hdf by default) start from a copy of it
+        appending = str(kwargs.get("mode", "a" if method is savers["hdf"] else "w"))[0] in ["a", "r"]
+        with atomic_path(path.full_path, copy_existing=appending) as tmp_path:
+            if streaming:
+                # schema, number of rows and statistics are collected while writing
+                data = ChunkTracker(data, StatsAccumulator() if stats else None)
+                method(data, tmp_path, **kwargs)
+                if data.schema is None:
+                    raise ValueError(f"No chunk to save to {path.full_path}")
+                file_stats = data.stats.result() if stats else None
+                n_rows, data = data.n_rows, data.schema
+            else:
+                method(data, tmp_path, **kwargs)
+                n_rows = INFER
+                file_stats = None
+                if stats and isinstance(data, pd.DataFrame):
+                    file_stats = compute_stats(data)
+                elif stats:
+                    logger.warning(f"stats are only computed for DataFrames. Got {type(data)}")
+            if content_hash and file_hash is None:
+                file_hash = get_content_hash(path=tmp_path)
+                existing = self._unchanged_file(path, file_hash, input_files) if skip_if_unchanged else None
+                if existing is not None:
+                    os.remove(tmp_path)  # not renamed to path
+                    return self._reuse_file(existing, path)
+            bytes_hash, dedup_of = None, None
+            if dedup:
+                bytes_hash = file_hash if file_hash and file_hash.startswith("file:") else get_content_hash(path=tmp_path)
+                dedup_of = self._dedup(path, tmp_path, bytes_hash)
         logger.info(f"Data saved to {path.full_path}")
+        invalidate_listing(path.dir_path)  # new file visible to :auto file names
+        if path.version is not None:
+            record_version(path.step_dir, path.version, path.file_name)
+
+        with self._lock:
+            saved_file_md = FileMetaData.from_data(
+                path, data, method_used, input_files, n_rows=n_rows,
+                input_selections=input_selections, stats=file_stats, content_hash=file_hash,
+                file_hash=bytes_hash, dedup=dedup_of,
+            )
 
-        saved_file_md = FileMetaData.from_data(
-            path, data, method.__str__(), self.md_direct_input_files
-        )
-
-        if alias != ":ignore":
-            self.columns_documentation(alias, data, path, saved_file_md)
-
-        self.md_all_files.append(saved_file_md)
-
-        # export metadata file
-        logger.info(f"Saving metadata to {path.dir_path}")
-        self._to_file(path)
+            if col_steps != ":auto":
+                saved_file_md.col_steps = col_steps
+            elif alias != ":ignore":
+                self.columns_documentation(alias, data, path, saved_file_md)
+
+            previous = self.md_all_files.get(saved_file_md.uuid)
+            if previous is not None and any(f["uuid"] == previous.uuid for f in saved_file_md.input_files):
+                # file overwritten after being loaded: it comes from the inputs of its previous content
+                inputs = [f for f in saved_file_md.input_files if f["uuid"] != previous.uuid]
+                uuids = {f["uuid"] for f in inputs}
+                saved_file_md.input_files = inputs + [f for f in previous.input_files if f["uuid"] not in uuids]
+            self.md_all_files.put(saved_file_md)  # replaces the record of a file saved again
+
+            # export metadata file
+            logger.info(f"Saving metadata to {path.dir_path}")
+            new_files = self._to_file(path)
+            if config.LINEAGE_INDEX or os.path.exists(index_path(path.root)):
+                self._update_index(path.root, new_files)
 
         if export_viz_tool:
             logger.info(f"Exporting viz tool to {path.dir_path}")
             if verbose:
                 print(f"Exporting viz folder to {path.dir_path}")
+            compact_metadata(path.metadata_path)
             export_viz_html(path.metadata_path, path.dir_path)
 
+        if retention is not None and path.version is not None:
+            collect_garbage(path.root, retention, step_dirs=[path.step_dir])
+
         # logger.setLevel(original_logger_level)
 
         return path
 
+    @staticmethod
+    def _unchanged_file(path: DataPath, file_hash: str, input_files: list[FileMetaData]) -> DataPath | None:
+        """
+        File with the same content and input files saved at path, or with the same name in the last version of
+        the step. None if there is none
+        """
+        candidates = [path]
+        previous = Step._previous_version(path)
+        if previous is not None:
+            candidates.append(previous)
+        input_uuids = {f.uuid for f in input_files}
+        for candidate in candidates:
+            previous_step = Step._from_path(candidate)
+            file_md = get_file_md(previous_step.md_all_files, candidate) if previous_step is not None else None
+            if (
+                file_md is not None
+                and file_md.content_hash == file_hash
+                and {f["uuid"] for f in file_md.input_files} == input_uuids
+                and os.path.exists(candidate.full_path)
+            ):
+                return candidate
+        return None
+
+    @staticmethod
+    def _previous_version(path: DataPath) -> DataPath | None:
+        """path in the last version of the step other than the one of path, by creation time. None if there is none"""
+        if path.version is None:
+            return None
+        versions = [v for v in ordered_versions(path.step_dir) if v != path.version]
+        if not versions:
+            return None
+        return DataPath(path.root, path.attrs, path.step_name, version=versions[-1], file_name=path.file_name)
+
+    @staticmethod
+    def _dedup(path: DataPath, tmp_path: str, bytes_hash: str) -> dict | None:
+        """
+        Replace the file written at tmp_path by a link to the file of the previous version if their bytes are the same
+        :return: the file linked to and the link used, None if not linked
+        """
+        previous = Step._previous_version(path)
+        if previous is None or not os.path.exists(previous.full_path):
+            return None
+        if os.path.getsize(previous.full_path) != os.path.getsize(tmp_path):
+            return None
+        previous_step = Step._from_path(previous)
+        previous_md = get_file_md(previous_step.md_all_files, previous) if previous_step is not None else None
+        if previous_md is not None and previous_md.file_hash is not None:
+            previous_hash = previous_md.file_hash
+        else:
+            previous_hash = get_content_hash(path=previous.full_path)
+        if previous_hash != bytes_hash:
+            return None
+        link_path = f"{tmp_path}.link"
+        try:
+            link = link_file(previous.full_path, link_path, config.DEDUP_LINK)
+        except OSError as e:
+            logger.warning(f"Cannot link {path.full_path} to {previous.full_path}, keeping a copy: {e}")
+            return None
+        os.replace(link_path, tmp_path)
+        logger.info(f"{path.full_path} identical to {previous.full_path}. Linked ({link})")
+        return dict(path=previous.full_path_from_root, link=link)
+
+    def _reuse_file(self, existing: DataPath, path: DataPath) -> DataPath:
+        """Register the file found unchanged as saved by this step"""
+        logger.info(f"Content of {path.full_path} unchanged. Reusing {existing.full_path}")
+        with self._lock:
+            file_md = get_file_md(Step._from_path(existing).md_all_files, existing)
+            self.md_all_files.put(file_md)
+            new_files = self._to_file(existing)
+            if config.LINEAGE_INDEX or os.path.exists(index_path(existing.root)):
+                self._update_index(existing.root, new_files)
+        return existing
+
+    async def aload(self, **kwargs) -> Any:
+        """
+        Coroutine version of load, taking the same arguments. Reading and parsing run in the default executor
+        so several loads can overlap with asyncio.gather
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.load, **kwargs))
+
+    async def asave(self, data: pd.DataFrame | Iterator[pd.DataFrame] | Any, **kwargs) -> DataPath:
+        """
+        Coroutine version of save, taking the same arguments. Writing runs in the default executor
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.save, data, **kwargs))
+
     def columns_documentation(
         self, alias: str | None, data: Any, path: DataPath, saved_file_md: FileMetaData
     ) -> None:
@@ -576,11 +1029,20 @@ class Step(ModuleType):
         if alias is not None:
             saved_file_md.col_steps = self.doc.metadata(data, alias)
 
+    def _col_steps(self, alias: str | None, data: Any, path: DataPath) -> list[dict]:
+        """Documentation of the columns of data saved to path, as columns_documentation would record it now"""
+        file_md = FileMetaData.from_data(path, data, n_rows=None)
+        with self._lock:  # the documentation is also updated by writes in progress
+            self.columns_documentation(alias, data, path, file_md)
+        return file_md.col_steps
+
     def reset(self):
         # === Exported === #
-        self.md_all_files: list[FileMetaData] = []
-        self.md_direct_input_files: list[FileMetaData] = []  # direct input to this step file
+        self.md_all_files: FileMetaDataList = []
+        self.md_direct_input_files: FileMetaDataList = []  # direct input to this step file
         # ================ #
+        self._input_selections = {}
+        self._journaled = {}
 
         # Default values of load and save functions
         self.set_defaults()
@@ -597,23 +1059,37 @@ class Step(ModuleType):
 
     def _files_needed_to_gen(self, files_to_gen: list[FileMetaData]) -> list[FileMetaData]:
         """
-        Risk of infinite loop if there is a cycle in the graph TODO
-        :param files_to_gen:
-        :return:
+        Files needed to generate files_to_gen, in the order of md_all_files.
+        Depth first traversal of the input files, visiting each file once
+        :raises ValueError: if the input files form a cycle
         """
-
-        def get_input_files(files: list[FileMetaData]) -> list[str]:
-            uuids = list(
-                {item["uuid"] for sublist in [e.input_files for e in files] for item in sublist}
-            )
-
-            if not len(uuids):
-                return []
-            return uuids + get_input_files([e for e in self.md_all_files if e.uuid in uuids])
-
-        # recursive
-        input_files = get_input_files(files_to_gen)
-        return [e for e in self.md_all_files if e.uuid in input_files]
+        needed = set()
+        for file in files_to_gen:
+            # branch being explored: (uuid, iterator over its input uuids)
+            stack = [(file.uuid, iter(file.input_files))]
+            on_branch = {file.uuid}
+            while stack:
+                uuid_, inputs = stack[-1]
+                input_file = next(inputs, None)
+                if input_file is None:
+                    stack.pop()
+                    on_branch.discard(uuid_)
+                    continue
+                input_uuid = input_file["uuid"]
+                if input_uuid in on_branch:
+                    cycle = [u for u, _ in stack[[u for u, _ in stack].index(input_uuid):]] + [input_uuid]
+                    raise ValueError(
+                        f"Cycle in the input files of {file.path}: "
+                        + " -> ".join(str(self.md_all_files.get(u).path) for u in cycle)
+                    )
+                if input_uuid in needed:
+                    continue
+                needed.add(input_uuid)
+                input_md = self.md_all_files.get(input_uuid)
+                if input_md is not None:
+                    stack.append((input_uuid, iter(input_md.input_files)))
+                    on_branch.add(input_uuid)
+        return [e for e in self.md_all_files if e.uuid in needed]
 
     @classmethod
     def _from_dict(cls, d):  # TODO clean
@@ -632,48 +1108,93 @@ class Step(ModuleType):
             for item in sublist
         }
         generated_files = [e for e in step.md_all_files if e.uuid not in input_files]
-        step.md_direct_input_files = list(
-            {
-                item["uuid"]
-                for sublist in [e.input_files for e in generated_files]
-                for item in sublist
-            }
-        )
-        step.md_direct_input_files = [
-            e for e in step.md_all_files if e.uuid in step.md_direct_input_files
-        ]  # useless?
+        direct_uuids = {
+            item["uuid"]
+            for sublist in [e.input_files for e in generated_files]
+            for item in sublist
+        }
+        step.md_direct_input_files = [e for e in step.md_all_files if e.uuid in direct_uuids]
         return step
 
     @classmethod
     def _from_file(cls, path):
         """
-        tries to load json meta data file, if no file, returns None
+        tries to load json meta data file, if no file, returns None.
+        Parsed records are cached until the metadata file or its journal change
         :param path:
         :return:
         """
-        if not os.path.exists(path):
+        signature = metadata_cache.signature(path, journal_path(path))
+        if signature == (None, None):
             logger.debug(f"no metadata file found in {path}")
             return None
-        return cls._from_dict(json.load(open(path, "r")))
+        records = metadata_cache.get_or_parse(path, signature, lambda: read_records(path))
+        if records is None:
+            return None
+        # the cached records are shared: each step gets its own FileMetaData, copying what it changes on access
+        return cls._from_dict(dict(files=records))
 
     @classmethod
     def _from_path(cls, path: DataPath):
         return Step._from_file(path.metadata_path)
 
-    def _to_file(self, path: DataPath):
-        """Save step to file"""
+    @staticmethod
+    def _update_index(root: str, files: list[FileMetaData]) -> None:
+        try:
+            LineageIndex(root).add(files)
+        except sqlite3.Error as e:
+            warnings.warn(
+                f"Lineage index of {root} not updated: {e!r}. Recreate it with python -m stdflow.stdflow_index rebuild {root}",
+                category=UserWarning,
+            )
+
+    def _to_file(self, path: DataPath) -> list[FileMetaData]:
+        """
+        Write the metadata of the files of this step to the directory. The first write of the step replaces the
+        metadata of earlier runs with a snapshot, the next ones append the files added or replaced since to the
+        metadata journal
+        :return: files written
+        """
         file_path = os.path.join(path.dir_path, FileMetaData.file_name)
-        if not os.path.exists(path.dir_path):
-            os.makedirs(path.dir_path)
-        if os.path.exists(file_path):
-            logger.debug(f"metadata file already exists in {file_path}. Replacing")
-        with open(file_path, "w") as f:
-            logger.debug(f"Saving metadata file to {file_path}")
-            # logger.debug(f"metadata: {self.__dict__()}")
-            json.dump(self.__dict__(), f)
+        os.makedirs(path.dir_path, exist_ok=True)
+        journal = journal_path(file_path)
+        written = self._journaled.get(file_path)
+        if written is None or (not os.path.exists(journal) and not os.path.exists(file_path)):
+            new_files = list(self.md_all_files)
+            logger.debug(f"Writing {len(new_files)} records to {file_path}")
+            aside = set_journal_aside(file_path)
+            write_base(file_path, [md.__dict__() for md in new_files])
+            if aside is not None:
+                os.remove(aside)
+        else:
+            # only the files added or replaced since the last write are serialized
+            new_files = self.md_all_files.changed_since(written)
+            logger.debug(f"Appending {len(new_files)} records to metadata journal {journal}")
+            append_records(file_path, [md.__dict__() for md in new_files])
+        metadata_cache.invalidate(file_path)
+        self._journaled[file_path] = self.md_all_files.last_change
+        if os.path.exists(journal) and os.path.getsize(journal) > METADATA_JOURNAL_MAX_BYTES:
+            compact_metadata(file_path)
+        return new_files
 
     # === Properties === #
 
+    @property
+    def md_all_files(self) -> FileMetaDataList:
+        return self._md_all_files
+
+    @md_all_files.setter
+    def md_all_files(self, files: Iterable[FileMetaData]) -> None:
+        self._md_all_files = FileMetaDataList(files)
+
+    @property
+    def md_direct_input_files(self) -> FileMetaDataList:
+        return self._md_direct_input_files
+
+    @md_direct_input_files.setter
+    def md_direct_input_files(self, files: Iterable[FileMetaData]) -> None:
+        self._md_direct_input_files = FileMetaDataList(files)
+
     @property
     def step_in(self) -> str:
         return self._step_in
@@ -778,6 +1299,14 @@ class Step(ModuleType):
     def root_out(self, root: str) -> None:
         self._root_out = root
 
+    @property
+    def retention(self) -> RetentionPolicy | None:
+        return self._retention
+
+    @retention.setter
+    def retention(self, retention: RetentionPolicy | None) -> None:
+        self._retention = retention
+
     @property
     def root(self) -> str:
         return self._root
@@ -0,0 +1,32 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from stdflow import Step
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"country": ["fr", "es", "it"], "value": [1.0, 2.0, 3.0]})
+
+
+def test_load_arrow_memory_map(tmp_path, df):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name="data.arrow")
+
+    step = Step(root=str(tmp_path))
+    table = step.load(step="raw", version=None, file_name="data.arrow")
+    assert isinstance(table, pa.Table)
+    assert table.to_pandas().equals(df)
+    assert [c["name"] for c in step.md_all_files[0].columns] == ["country", "value"]
+    assert step.md_all_files[0].n_rows == 3
+
+
+@pytest.mark.parametrize("file_name", ["data.feather", "data.parquet"])
+def test_load_arrow_method(tmp_path, df, file_name):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name=file_name)
+
+    loaded = Step(root=str(tmp_path)).load(step="raw", version=None, file_name=file_name, method="arrow", as_pandas=True)
+    assert isinstance(loaded["value"].dtype, pd.ArrowDtype)
+    assert loaded["value"].tolist() == [1.0, 2.0, 3.0]
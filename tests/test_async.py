@@ -0,0 +1,38 @@
+import asyncio
+
+import pandas as pd
+
+import stdflow as sf
+from stdflow import Step
+
+
+def test_aload_asave(tmp_path):
+    async def run():
+        step = Step(root=str(tmp_path), version=None)
+        await asyncio.gather(
+            *(
+                step.asave(pd.DataFrame({"day": [day], "value": [day * 10]}), step="raw", file_name=f"day_{day}.csv", index=False)
+                for day in range(10)
+            )
+        )
+
+        step = Step(root=str(tmp_path), version=None)
+        loaded = await asyncio.gather(*(step.aload(step="raw", file_name=f"day_{day}.csv") for day in range(10)))
+        return step, loaded
+
+    step, loaded = asyncio.run(run())
+    assert [df["value"].iloc[0] for df in loaded] == [day * 10 for day in range(10)]
+    assert len(step.md_direct_input_files) == 10
+    assert len({f.uuid for f in step.md_all_files}) == len(step.md_all_files) == 10
+
+    # all concurrent saves are in the metadata file
+    saved = Step._from_file(str(tmp_path / "step_raw" / "metadata.json"))
+    assert len(saved.md_all_files) == 10
+
+
+def test_package_level_aload(tmp_path):
+    pd.DataFrame({"a": [1]}).to_csv(tmp_path / "data.csv", index=False)
+    sf.reset()
+    df = asyncio.run(sf.aload(root=str(tmp_path), file_name="data.csv", version=None))
+    assert df["a"].tolist() == [1]
+    sf.reset()
@@ -0,0 +1,104 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import stdflow as sf
+from stdflow import Step
+from stdflow.stdflow_utils.background import BackgroundWriter
+from stdflow.stdflow_utils.io import atomic_path
+
+
+def test_background_save(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    future = step.save(df, step="raw", file_name="a.csv", index=False, background=True)
+    df["a"] = 0  # the snapshot taken at save time is written
+
+    path = future.result()
+    assert path.full_path == os.path.join(str(tmp_path), "step_raw", "a.csv")
+    assert Step(root=str(tmp_path), version=None).load(step="raw", file_name="a.csv")["a"].tolist() == [1, 2, 3]
+    assert [f for f in os.listdir(tmp_path / "step_raw") if f.startswith(".~")] == []
+
+
+def test_background_save_documentation_at_call(tmp_path):
+    pd.DataFrame({"a": [1]}).to_csv(tmp_path / "raw.csv", index=False)
+    step = Step(root=str(tmp_path), version=None)
+    df = step.load(file_name="raw.csv", alias="raw")
+    written = threading.Event()
+
+    def save_when_set(data, path, **kwargs):
+        written.wait(5)
+        data.to_csv(path, **kwargs)
+
+    future = step.save(
+        df, step="out", file_name="out.csv", method=save_when_set, index=False, alias="raw",
+        background=True,
+    )
+    step.col_step("raw::a", "Changed after the save.", ["raw::a"])
+    written.set()
+    future.result()
+
+    saved = Step._from_file(str(tmp_path / "step_out" / "metadata.json"))
+    col_steps = saved.md_all_files.get_by_path(future.result()).col_steps
+    assert col_steps and all(s["col_step"] != "Changed after the save." for s in col_steps)
+
+
+def test_flush(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    for i in range(20):
+        step.save(pd.DataFrame({"a": [i]}), step="raw", file_name=f"{i}.csv", index=False, background=True)
+    sf.flush()
+
+    assert len(Step._from_file(str(tmp_path / "step_raw" / "metadata.json")).md_all_files) == 20
+
+
+def test_flush_raises_write_errors():
+    writer = BackgroundWriter(max_workers=1, max_pending=2)
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.submit(fail)
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    writer.flush()  # errors are raised once
+
+
+def test_submit_blocks_when_queue_full():
+    writer = BackgroundWriter(max_workers=1, max_pending=1)
+    release = threading.Event()
+    writer.submit(release.wait)
+
+    submitted = threading.Event()
+    threading.Thread(target=lambda: (writer.submit(lambda: None), submitted.set())).start()
+    assert not submitted.wait(0.2)
+    release.set()
+    assert submitted.wait(5)
+    writer.flush()
+
+
+def test_atomic_path(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_path(str(path)) as tmp:
+            assert tmp.endswith(".csv")
+            with open(tmp, "w") as f:
+                f.write("partial")
+            raise RuntimeError
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["a.csv"]
+
+
+def test_save_append_mode(tmp_path):
+    step = Step(root=str(tmp_path))
+    path = step.save(pd.DataFrame({"a": [1]}), step="raw", version="1", file_name="a.csv", index=False)
+    step.save(pd.DataFrame({"a": [2]}), step="raw", version="1", file_name="a.csv", index=False, mode="a", header=False)
+    assert pd.read_csv(path.full_path)["a"].tolist() == [1, 2]
+
+    with atomic_path(path.full_path, copy_existing=True) as tmp:
+        with open(tmp, "a") as f:
+            f.write("3\n")
+    assert pd.read_csv(path.full_path)["a"].tolist() == [1, 2, 3]
@@ -0,0 +1,41 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from stdflow import Step, config
+from stdflow.stdflow_utils.codec import decode, encode
+from stdflow.stdflow_utils.journal import compact
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_roundtrip(codec):
+    pytest.importorskip(codec)
+    obj = dict(files=[dict(uuid="a", n_rows=None, columns=[dict(name="x", type="int64")])])
+    assert decode(encode(obj, codec)) == obj
+
+
+@pytest.mark.parametrize("codec", ["orjson", "msgpack"])
+def test_metadata_codec(tmp_path, monkeypatch, codec):
+    pytest.importorskip(codec)
+    monkeypatch.setattr(config, "METADATA_CODEC", codec)
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="a.csv", index=False)
+    compact(str(tmp_path / "step_out" / "metadata.json"))
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="b.csv", index=False, export_viz_tool=True)
+
+    # detected on load
+    saved = Step._from_file(str(tmp_path / "step_out" / "metadata.json"))
+    assert [f.path.file_name for f in saved.md_all_files] == ["a.csv", "b.csv"]
+
+    # plain json for the viewer
+    with open(tmp_path / "step_out" / "metadata_viz" / "metadata.json") as f:
+        assert len(json.load(f)["files"]) == 2
+
+
+def test_missing_codec_falls_back_to_json(monkeypatch):
+    monkeypatch.setitem(sys.modules, "msgpack", None)
+    with pytest.warns(UserWarning):
+        data = encode({"a": 1}, "msgpack")
+    assert json.loads(data) == {"a": 1}
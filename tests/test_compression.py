@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.stdflow_loaders.compression import auto_compression, describe, recorded_compression, sniff_compression
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"a": np.arange(5_000), "b": rng.choice(["x", "yy", "zzz"], 5_000)})
+
+
+@pytest.mark.parametrize("method", ["csv", "jsonl", "pickle", "parquet", "arrow"])
+def test_auto_compression_roundtrip(tmp_path, df, method):
+    step = Step(root=str(tmp_path), version=None)
+    path = step.save(df, step="out", file_name=f"data.{method}", method=method, compression=":auto", compression_policy="size")
+
+    md = Step._from_file(path.metadata_path).md_all_files[0]
+    assert "compression=" in md.export_method_used
+
+    loaded = Step(root=str(tmp_path), version=None).load(step="out", file_name=f"data.{method}", method=method)
+    if method == "csv":
+        loaded = loaded.drop(columns="Unnamed: 0")
+    if method == "arrow":
+        loaded = loaded.to_pandas()
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+def test_size_policy_compresses_text(df):
+    kwargs = auto_compression(df, "csv", "size")
+    assert describe(kwargs) != "none"
+
+
+def test_auto_compression_streaming(tmp_path, df):
+    step = Step(root=str(tmp_path), version=None)
+    chunks = (df.iloc[i : i + 1_000] for i in range(0, len(df), 1_000))
+    step.save(chunks, step="out", file_name="data.csv", index=False, compression=":auto", compression_policy="size")
+
+    loaded = Step(root=str(tmp_path), version=None).load(step="out", file_name="data.csv")
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+def test_load_sniffs_codec(tmp_path, df):
+    df.to_csv(tmp_path / "data.csv", index=False, compression="gzip")
+    assert sniff_compression(str(tmp_path / "data.csv")) == "gzip"
+    pd.testing.assert_frame_equal(Step(root=str(tmp_path), version=None).load(file_name="data.csv"), df)
+
+
+def test_load_text_starting_like_bz2(tmp_path):
+    (tmp_path / "data.csv").write_text("BZh_code,value\nA,1\n")
+    assert sniff_compression(str(tmp_path / "data.csv")) is None
+    df = pd.DataFrame({"a": [1, 2]})
+    df.to_csv(tmp_path / "data.bz2.csv", index=False, compression="bz2")
+    assert sniff_compression(str(tmp_path / "data.bz2.csv")) == "bz2"
+
+    step = Step(root=str(tmp_path), version=None)
+    assert step.load(file_name="data.csv")["BZh_code"].tolist() == ["A"]
+    step.save(pd.DataFrame({"BZh_code": ["A"]}), step="out", file_name="data.csv", index=False, compression=None)
+    assert step.load(step="out", file_name="data.csv")["BZh_code"].tolist() == ["A"]
+
+
+def test_recorded_compression():
+    assert recorded_compression("csv compression=zstd:3") == "zstd"
+    assert recorded_compression("csv compression=none") == "none"
+    assert recorded_compression("csv") is None
+    assert recorded_compression(None) is None
+
+
+def test_auto_compression_unsupported(tmp_path, df):
+    with pytest.raises(ValueError):
+        Step(root=str(tmp_path), version=None).save(df, file_name="data.xlsx", compression=":auto")
@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+
+from stdflow import Step
+
+
+def run(root, values, version):
+    step = Step(root=root)
+    raw = step.load(step="raw", version="1", file_name="raw.csv")
+    return step.save(
+        raw.assign(b=values), step="clean", version=version, file_name="clean.parquet", skip_if_unchanged=True
+    )
+
+
+def test_skip_unchanged_version(tmp_path):
+    root = str(tmp_path)
+    Step(root=root).save(pd.DataFrame({"a": [1, 2]}), step="raw", version="1", file_name="raw.csv", index=False)
+
+    first = run(root, [3, 4], "1")
+    mtime = os.path.getmtime(first.full_path)
+    uuid = Step._from_path(first).md_all_files[-1].uuid
+
+    # unchanged: the previous version is reused, the new one is not created
+    second = run(root, [3, 4], "2")
+    assert second.full_path == first.full_path
+    assert os.path.getmtime(first.full_path) == mtime
+    assert not (tmp_path / "step_clean" / "v_2").exists()
+
+    # downstream steps keep the same input uuid
+    step = Step(root=root)
+    step.load(step="clean", version=":last", file_name="clean.parquet")
+    assert step.md_direct_input_files[0].uuid == uuid
+
+    # changed content is written
+    third = run(root, [3, 5], "2")
+    assert third.full_path.endswith(os.path.join("v_2", "clean.parquet"))
+
+
+def test_skip_unchanged_same_path(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    data = {"a": [1]}  # not a DataFrame: the bytes written are compared
+    first = step.save(data, step="out", file_name="data.pkl", skip_if_unchanged=True)
+    md = Step._from_path(first).md_all_files[-1]
+    assert md.content_hash.startswith("file:")
+
+    step.save(data, step="out", file_name="data.pkl", skip_if_unchanged=True)
+    assert [f for f in os.listdir(tmp_path / "step_out") if f.startswith(".~")] == []
+    assert Step._from_path(first).md_all_files[-1].uuid == md.uuid
+
+
+def test_content_hash(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    df = pd.DataFrame({"a": [1, 2]})
+    a = step.save(df, step="out", file_name="a.csv", index=False, content_hash=True)
+    b = step.save(df.copy(), step="out", file_name="b.csv", index=False, content_hash=True)
+    files = Step._from_path(a).md_all_files
+    assert files[0].content_hash == files[1].content_hash
+    assert files[0].content_hash.startswith("frame:")
+
+
+def test_skip_unchanged_other_save_arguments(tmp_path):
+    root = str(tmp_path)
+    df = pd.DataFrame({"a": [1, 2]})
+    Step(root=root).save(df, step="out", version="1", file_name="f.csv", content_hash=True)
+    path = Step(root=root).save(df, step="out", version="2", file_name="f.csv", index=False, skip_if_unchanged=True)
+    assert path.version == "2"
+    assert pd.read_csv(path.full_path).columns.tolist() == ["a"]
+
+
+def test_skip_unchanged_after_saving_same_path_twice(tmp_path):
+    root = str(tmp_path)
+    df1, df2 = pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"b": [3, 4]})
+    step = Step(root=root)
+    for df in [df1, df2]:
+        step.save(df, step="out", version="1", file_name="f.csv", index=False, skip_if_unchanged=True)
+
+    Step(root=root).save(df1, step="out", version="1", file_name="f.csv", index=False, skip_if_unchanged=True)
+    assert Step(root=root).load(step="out", version="1", file_name="f.csv").equals(df1)
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from stdflow import Step, config
+from stdflow.stdflow_utils.io import link_file
+from stdflow.stdflow_utils.retention import RetentionPolicy, collect_garbage
+
+
+def save(root, df, version):
+    return Step(root=root).save(df, step="ref", version=version, file_name="ref.csv", index=False, dedup=True)
+
+
+def test_dedup_identical_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DEDUP_LINK", "hardlink")
+    root = str(tmp_path)
+    df = pd.DataFrame({"a": range(100)})
+    first = save(root, df, "1")
+    second = save(root, df, "2")
+    third = save(root, df.assign(a=df["a"] + 1), "3")
+
+    assert os.path.samefile(first.full_path, second.full_path)
+    assert not os.path.samefile(second.full_path, third.full_path)
+    first_md, second_md, third_md = (Step._from_path(p).md_all_files[-1] for p in [first, second, third])
+    assert first_md.dedup is None and first_md.file_hash.startswith("file:")
+    assert second_md.dedup == dict(path=first.full_path_from_root, link="hardlink")
+    assert second_md.file_hash == first_md.file_hash
+    assert third_md.dedup is None
+    assert Step(root=root).load(step="ref", version="2", file_name="ref.csv").equals(df)
+
+    # the linked file is kept when the version it was linked to is deleted
+    v_1 = tmp_path / "step_ref" / "v_1"
+    metadata_size = sum(f.stat().st_size for f in v_1.iterdir() if f.name != "ref.csv")
+    summary = collect_garbage(root, RetentionPolicy(keep_last=2))
+    assert summary["deleted"] == [str(v_1)]
+    assert summary["bytes_reclaimed"] == metadata_size  # ref.csv still linked from v_2
+    assert Step(root=root).load(step="ref", version="2", file_name="ref.csv").equals(df)
+
+
+def test_link_file_fallback(tmp_path):
+    src, dst = tmp_path / "a.csv", tmp_path / "b.csv"
+    src.write_text("a\n1\n")
+    assert link_file(str(src), str(dst)) in ["reflink", "hardlink"]
+    assert dst.read_text() == "a\n1\n"
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from stdflow.filemetadata import FileMetaData, FileMetaDataList
+from stdflow.stdflow_path import DataPath
+
+
+def record():
+    md = FileMetaData.from_data(
+        DataPath(None, attrs=["fr"], step_name="raw", version="1", file_name="a.csv"), pd.DataFrame({"a": [1]})
+    )
+    return md.__dict__()
+
+
+def test_from_dict_is_lazy():
+    md = FileMetaData.from_dict(record())
+    assert md._path is None
+    FileMetaDataList([md])  # indexing by uuid does not decode the path
+    assert md._path is None
+    assert md.__dict__() == record()
+
+    assert md.path.full_path_from_root == "fr/step_raw/v_1/a.csv"
+    assert md.columns == [{"name": "a", "type": "int64"}]
+    assert md.__dict__()["step"] == record()["step"]
+
+
+def test_slots():
+    md = FileMetaData.from_dict(record())
+    with pytest.raises(AttributeError):
+        md.other = 1
+    md.col_steps = [{"col": "a"}]
+    assert md.__dict__()["col_steps"] == [{"col": "a"}]
@@ -0,0 +1,86 @@
+import pandas as pd
+
+from stdflow import Step
+from stdflow.filemetadata import FileMetaData, FileMetaDataList, get_file_md
+from stdflow.stdflow_path import DataPath
+
+
+def md(file_name):
+    return FileMetaData.from_data(DataPath(None, step_name="raw", version=None, file_name=file_name), pd.DataFrame({"a": [1]}))
+
+
+def test_file_metadata_list():
+    a, b, c = md("a.csv"), md("b.csv"), md("c.csv")
+    files = FileMetaDataList([a, b])
+    files.append(a)  # already present
+    files.extend([c, b])
+
+    assert list(files) == [a, b, c]
+    assert len(files) == 3 and files[0] is a and files[-1] is c
+    assert b in files and b.uuid in files and b.path in files
+    assert files.get(c.uuid) is c
+    assert get_file_md(files, DataPath(None, step_name="raw", version=None, file_name="b.csv")) is b
+    assert files == [a, b, c]
+
+
+def test_step_keeps_load_order(tmp_path):
+    for i in range(3):
+        pd.DataFrame({"a": [i]}).to_csv(tmp_path / f"{i}.csv", index=False)
+    step = Step(root=str(tmp_path), version=None)
+    for i in [2, 0, 2, 1]:
+        step.load(file_name=f"{i}.csv")
+
+    assert isinstance(step.md_all_files, FileMetaDataList)
+    assert [f.path.file_name for f in step.md_direct_input_files] == ["2.csv", "0.csv", "1.csv"]
+    assert [f["file_name"] for f in step.__dict__()["files"]] == ["2", "0", "1"]
+
+
+def test_put_replaces_in_place():
+    a, b, c = md("a.csv"), md("b.csv"), md("c.csv")
+    files = FileMetaDataList([a, b, c])
+    new_b = md("b.csv")
+    new_b.n_rows = 2
+    files.put(new_b)
+    files.put(md("d.csv"))
+
+    assert [f.path.file_name for f in files] == ["a.csv", "b.csv", "c.csv", "d.csv"]
+    assert files[1] is new_b and files.get(b.uuid) is new_b and get_file_md(files, b.path) is new_b
+
+
+def test_step_saves_same_path_twice(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="out.csv", index=False)
+    step.save(pd.DataFrame({"a": [1, 2], "b": [3, 4]}), step="out", file_name="out.csv", index=False)
+
+    assert len(step.md_all_files) == 1
+    saved = Step._from_file(str(tmp_path / "step_out" / "metadata.json")).md_all_files
+    assert len(saved) == 1
+    assert saved[0].n_rows == 2 and [c["name"] for c in saved[0].columns] == ["a", "b"]
+
+
+def test_step_overwrites_loaded_file(tmp_path):
+    pd.DataFrame({"a": [1]}).to_csv(tmp_path / "raw.csv", index=False)
+    step = Step(root=str(tmp_path), version=None)
+    df = step.load(file_name="raw.csv")
+    step.save(df, step="out", file_name="out.csv", index=False)
+    out = step.load(step="out", file_name="out.csv")
+    step.save(out.assign(b=2), step="out", file_name="out.csv", index=False)
+
+    saved = step.md_all_files.get_by_path(DataPath(str(tmp_path), step_name="out", version=None, file_name="out.csv"))
+    raw = step.md_all_files.get_by_path(DataPath(str(tmp_path), version=None, file_name="raw.csv"))
+    assert saved.input_files == [{"uuid": raw.uuid}]
+    assert step._files_needed_to_gen([saved]) == [raw]
+
+
+def test_changed_since():
+    a, b, c = md("a.csv"), md("b.csv"), md("c.csv")
+    files = FileMetaDataList([a, b])
+    change = files.last_change
+    assert files.changed_since(0) == [a, b] and files.changed_since(change) == []
+
+    files.append(a)  # already present: unchanged
+    files.append(c)
+    b_again = FileMetaData.from_data(b.path, pd.DataFrame({"a": [2]}))
+    files.put(b_again)
+    assert files.changed_since(change) == [c, b_again]
+    assert FileMetaDataList().last_change == 0
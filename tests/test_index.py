@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pandas as pd
+
+from stdflow import Step, config
+from stdflow.stdflow_index import LineageIndex, index_path
+
+
+def pipeline(root):
+    step = Step(root=root)
+    step.save(pd.DataFrame({"a": [1]}), step="raw", version="1", file_name="a.csv", index=False)
+    step.save(pd.DataFrame({"a": [2]}), step="raw", version="2", file_name="a.csv", index=False)
+
+    step = Step(root=root)
+    a = step.load(step="raw", version=":last", file_name="a.csv")
+    step.save(a, step="clean", version="1", file_name="b.csv", index=False)
+
+    step = Step(root=root)
+    b = step.load(step="clean", version="1", file_name="b.csv")
+    step.save(b, step="final", version="1", file_name="c.csv", index=False)
+
+
+def check(index):
+    a = index.file("step_raw/v_2/a.csv")
+    c = index.file("step_final/v_1/c.csv")
+    assert [f["path"] for f in index.ancestors(c["uuid"])] == ["step_clean/v_1/b.csv", "step_raw/v_2/a.csv"]
+    assert [f["path"] for f in index.descendants(a["uuid"])] == ["step_clean/v_1/b.csv", "step_final/v_1/c.csv"]
+    assert index.descendants(index.file("step_raw/v_1/a.csv")["uuid"]) == []
+    assert index.latest_version(None, "raw") == "2"
+
+
+def test_index_updated_on_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LINEAGE_INDEX", True)
+    pipeline(str(tmp_path))
+    check(LineageIndex(str(tmp_path)))
+
+
+def test_index_replaces_inputs_of_file_saved_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LINEAGE_INDEX", True)
+    root = str(tmp_path)
+    for name in ["a", "b"]:
+        Step(root=root, version=None).save(pd.DataFrame({"a": [1]}), step="raw", file_name=f"{name}.csv", index=False)
+    for name in ["a", "b"]:
+        step = Step(root=root, version=None)
+        df = step.load(step="raw", file_name=f"{name}.csv")
+        step.save(df, step="out", file_name="o.csv", index=False)
+
+    index = LineageIndex(root)
+    assert [f["path"] for f in index.ancestors(index.file("step_out/o.csv")["uuid"])] == ["step_raw/b.csv"]
+
+
+def test_rebuild(tmp_path):
+    pipeline(str(tmp_path))
+    assert not (tmp_path / ".stdflow").exists()  # disabled by default
+
+    subprocess.run([sys.executable, "-m", "stdflow.stdflow_index", "rebuild", str(tmp_path)], check=True)
+    check(LineageIndex(str(tmp_path)))
+
+    # an existing index is kept up to date
+    step = Step(root=str(tmp_path))
+    step.save(pd.DataFrame({"a": [3]}), step="raw", version="3", file_name="a.csv", index=False)
+    assert LineageIndex(str(tmp_path)).latest_version(None, "raw") == "3"
+    assert index_path(str(tmp_path)).startswith(str(tmp_path))
+
+
+def test_latest_version_by_creation_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LINEAGE_INDEX", True)
+    step = Step(root=str(tmp_path))
+    for version in ["9", "10"]:  # name order differs from creation order
+        step.save(pd.DataFrame({"a": [1]}), step="raw", version=version, file_name="a.csv", index=False)
+    assert LineageIndex(str(tmp_path)).latest_version(None, "raw") == "10"
+    assert LineageIndex(str(tmp_path)).latest_version(None, "other") is None
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pandas as pd
+
+from stdflow import Step
+from stdflow.stdflow_utils.cache import metadata_cache
+from stdflow.stdflow_utils.journal import JOURNAL_FILE_NAME, compact, journal_path, read_records
+
+
+def test_save_appends_new_records_only(tmp_path):
+    pd.DataFrame({"a": [1]}).to_csv(tmp_path / "raw.csv", index=False)
+    step = Step(root=str(tmp_path), version=None)
+    df = step.load(file_name="raw.csv")
+    for i in range(5):
+        step.save(df, step="out", file_name=f"{i}.csv", index=False)
+
+    out = tmp_path / "step_out"
+    assert len(read_records(str(out / "metadata.json"))) == 6
+    with open(out / JOURNAL_FILE_NAME) as f:
+        assert len(f.readlines()) == 4  # the first save writes metadata.json, then one record per save
+
+    saved = Step._from_file(str(out / "metadata.json"))
+    assert len(saved.md_all_files) == 6
+    assert [f.path.file_name for f in saved.md_direct_input_files] == ["raw.csv"]
+
+
+def test_save_in_place_replaces_record(tmp_path):
+    for value in [1, 2]:
+        step = Step(root=str(tmp_path), version=None)
+        step.save(pd.DataFrame({"a": [value]}), step="out", file_name="a.csv", index=False)
+
+    metadata_path = str(tmp_path / "step_out" / "metadata.json")
+    records = read_records(metadata_path)
+    assert len(records) == 1
+    assert records[0]["uuid"] == Step._from_file(metadata_path).md_all_files[0].uuid
+
+
+def test_new_run_replaces_records_of_earlier_run(tmp_path):
+    for name in ["a", "b"]:
+        pd.DataFrame({"a": [1]}).to_csv(tmp_path / f"{name}.csv", index=False)
+    for name in ["a", "b"]:
+        step = Step(root=str(tmp_path), version=None)
+        df = step.load(file_name=f"{name}.csv")
+        step.save(df, step="out", file_name="o.csv", index=False)
+
+    records = read_records(str(tmp_path / "step_out" / "metadata.json"))
+    assert sorted(r["file_name"] for r in records) == ["b", "o"]
+    assert not (tmp_path / "step_out" / JOURNAL_FILE_NAME).exists()
+
+
+def test_compact(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="a.csv", index=False)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="b.csv", index=False, export_viz_tool=True)
+
+    metadata_path = str(tmp_path / "step_out" / "metadata.json")
+    assert not os.path.exists(journal_path(metadata_path))
+    with open(metadata_path) as f:
+        assert [r["file_name"] for r in json.load(f)["files"]] == ["a", "b"]
+
+    # journal on top of the compacted file
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="c.csv", index=False)
+    assert len(read_records(metadata_path)) == 3
+    compact(metadata_path)
+    assert len(read_records(metadata_path)) == 3
+    assert not os.path.exists(journal_path(metadata_path))
+
+
+def test_legacy_metadata_file(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="a.csv", index=False)
+    metadata_path = str(tmp_path / "step_out" / "metadata.json")
+    compact(metadata_path)
+
+    step = Step(root=str(tmp_path), version=None)
+    step.load(step="out", file_name="a.csv")
+    assert len(step.md_all_files) == 1
+
+
+def test_metadata_parsed_once(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    for i in range(5):
+        step.save(pd.DataFrame({"a": [i]}), step="out", file_name=f"{i}.csv", index=False)
+
+    metadata_cache.clear()
+    misses = metadata_cache.misses
+    step = Step(root=str(tmp_path), version=None)
+    for i in range(5):
+        step.load(step="out", file_name=f"{i}.csv")
+    assert metadata_cache.misses == misses + 1
+    assert len(step.md_all_files) == 5
+
+    # a save in the directory invalidates the parsed metadata
+    step.save(pd.DataFrame({"a": [5]}), step="out", file_name="5.csv", index=False)
+    assert len(Step._from_file(str(tmp_path / "step_out" / "metadata.json")).md_all_files) == 6
+    assert metadata_cache.misses == misses + 2
+
+
+def test_save_again_after_compaction(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    df = pd.DataFrame({"a": [1]})
+    step.save(df, step="out", file_name="a.csv", index=False, export_viz_tool=True)
+    assert not (tmp_path / "step_out" / JOURNAL_FILE_NAME).exists()  # compacted for the viz export
+    step.save(df, step="out", file_name="a.csv", index=False)
+    assert len(read_records(str(tmp_path / "step_out" / "metadata.json"))) == 1
+
+
+def test_cached_metadata_not_shared_between_steps(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1]}), step="raw", file_name="raw.csv", index=False)
+    df = step.load(step="raw", file_name="raw.csv", alias="raw")
+    step.save(df, step="out", file_name="out.csv", index=False, alias="out")
+
+    x, y = Step(root=str(tmp_path), version=None), Step(root=str(tmp_path), version=None)
+    x.load(step="out", file_name="out.csv", alias="first")
+    y.load(step="out", file_name="out.csv", alias="second")
+    md_x, md_y = x.md_all_files.get_by_path(x.md_direct_input_files[0].path), y.md_direct_input_files[0]
+    assert md_x is not md_y
+    assert md_x.col_steps and {s["alias"] for s in md_x.col_steps} == {"first"}
+    assert {s["alias"] for s in md_y.col_steps} == {"second"}
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.filemetadata import FileMetaData
+from stdflow.stdflow_path import DataPath
+
+
+def md(file_name):
+    return FileMetaData.from_data(DataPath(None, step_name="raw", version=None, file_name=file_name), pd.DataFrame({"a": [1]}))
+
+
+def lineage(n):
+    files = [md(f"{i}.csv") for i in range(n)]
+    for parent, child in zip(files, files[1:]):
+        child.input_files = [{"uuid": parent.uuid}]
+    return files
+
+
+def test_files_needed_to_gen():
+    files = lineage(500)
+    # shared ancestor reached from two branches
+    files[-1].input_files.append({"uuid": files[10].uuid})
+    step = Step(md_all_files=files)
+
+    assert step._files_needed_to_gen([files[-1]]) == files[:-1]
+    assert step._files_needed_to_gen([files[3], files[1]]) == files[:3]
+    assert step._files_needed_to_gen([files[0]]) == []
+
+
+def test_files_needed_to_gen_cycle():
+    files = lineage(4)
+    files[0].input_files = [{"uuid": files[2].uuid}]
+    step = Step(md_all_files=files)
+
+    with pytest.raises(ValueError, match="Cycle"):
+        step._files_needed_to_gen([files[3]])
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import stdflow as sf
+from stdflow import Step
+from stdflow.stdflow_utils.cache import LoadCache, load_cache
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"country": ["fr", "es", "it"], "value": [1, 2, 3]})
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    load_cache.clear()
+    yield
+    load_cache.clear()
+
+
+def test_load_cache_hit(tmp_path, df):
+    Step(root=str(tmp_path), version=None).save(df, step="raw", file_name="data.csv", index=False)
+
+    step = Step(root=str(tmp_path), version=None)
+    stats = load_cache.stats()
+    first = step.load(step="raw", file_name="data.csv", cache=True)
+    second = step.load(step="raw", file_name="data.csv", cache=True)
+    assert load_cache.stats()["misses"] == stats["misses"] + 1
+    assert load_cache.stats()["hits"] == stats["hits"] + 1
+
+    # copies are returned
+    first["value"] = 0
+    assert second["value"].tolist() == [1, 2, 3]
+    assert step.load(step="raw", file_name="data.csv", cache=True)["value"].tolist() == [1, 2, 3]
+
+    # lineage recorded on hits
+    assert len(step.md_all_files) == 1
+    assert sf.load_cache is load_cache
+
+
+def test_load_cache_invalidated_on_new_file(tmp_path, df):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name="data.csv", index=False)
+    step.load(step="raw", file_name="data.csv", cache=True)
+
+    step.save(df.assign(value=df["value"] * 10), step="raw", file_name="data.csv", index=False)
+    # same path but new creation time
+    assert step.load(step="raw", file_name="data.csv", cache=True)["value"].tolist() == [10, 20, 30]
+
+
+def test_load_cache_eviction(df):
+    cache = LoadCache(max_bytes=int(df.memory_usage(deep=True).sum()) * 2)
+    for i in range(3):
+        cache.get_or_load(("key", i), lambda: df)
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 2
+    assert cache.nbytes <= cache.max_bytes
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+from stdflow import Step
+
+
+@pytest.fixture
+def shards(tmp_path):
+    step = Step(root=str(tmp_path), step_out="ingestion", version="1")
+    for day in range(1, 6):
+        step.save(pd.DataFrame({"day": [day, day], "value": [day * 10, day * 11]}), file_name=f"day_{day}.csv", index=False)
+    return tmp_path
+
+
+def test_load_concat(shards):
+    step = Step(root=str(shards), step_in="ingestion")
+    df = step.load(file_name="*.csv", file_glob=True, combine="concat", max_workers=3)
+
+    assert df["day"].tolist() == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+    assert len(step.md_direct_input_files) == 5
+    assert len(step.md_all_files) == 5
+    assert sorted(f.path.file_name for f in step.md_direct_input_files) == [f"day_{d}.csv" for d in range(1, 6)]
+
+    # metadata of the generated files are reused
+    saved = Step._from_file(os.path.join(shards, "step_ingestion", "v_1", "metadata.json"))
+    assert {f.uuid for f in saved.md_all_files} == {f.uuid for f in step.md_all_files}
+
+
+def test_load_dict(shards):
+    step = Step(root=str(shards), step_in="ingestion")
+    data = step.load(file_name="day_[12].csv", combine="dict", columns=["value"])
+
+    assert list(data.keys()) == ["day_1", "day_2"]
+    assert data["day_2"].columns.tolist() == ["value"]
+    out = step.save(pd.concat(data.values()), step="merged", version=None, file_name="merged.csv")
+    assert [f["selection"]["columns"] for f in step.md_all_files[-1].input_files] == [["value"], ["value"]]
+    assert out.file_name == "merged.csv"
+
+
+def test_load_no_match(shards):
+    with pytest.raises(ValueError):
+        Step(root=str(shards), step_in="ingestion").load(file_name="*.parquet", combine="concat")
+
+
+def test_load_glob_skips_metadata(shards):
+    data = Step(root=str(shards), step_in="ingestion").load(file_name="*", combine="dict")
+    assert list(data.keys()) == [f"day_{d}" for d in range(1, 6)]
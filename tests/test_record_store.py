@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+
+import pandas as pd
+
+import stdflow as sf
+from stdflow import Step
+from stdflow.stdflow_utils.journal import append_records, read_records
+from stdflow.stdflow_utils.record_store import compact_root, read_store, store_path
+
+
+def chain(root, n_steps):
+    Step(root=root, version=None).save(pd.DataFrame({"a": [1]}), step="s0", file_name="data.csv", index=False)
+    for i in range(1, n_steps):
+        step = Step(root=root, version=None)
+        df = step.load(step=f"s{i - 1}", file_name="data.csv")
+        step.save(df, step=f"s{i}", file_name="data.csv", index=False)
+
+
+def test_compact_root(tmp_path):
+    root = str(tmp_path)
+    chain(root, 6)
+    last = str(tmp_path / "step_s5" / "metadata.json")
+    before = [r["uuid"] for r in read_records(last)]
+
+    summary = compact_root(root)
+    assert summary["metadata_files"] == 6
+    assert summary["bytes_after"] < summary["bytes_before"]
+    assert len(read_store(store_path(root))) == 4  # s0 to s3 are ancestors of the inputs of another step
+
+    with open(last) as f:
+        files = json.load(f)["files"]
+    assert sum("ref" in r for r in files) == 4
+    # references resolved transparently
+    assert [r["uuid"] for r in read_records(last)] == before
+
+    step = Step(root=root, version=None)
+    step.load(step="s5", file_name="data.csv")
+    assert len(step.md_all_files) == 6
+    step.save(pd.DataFrame({"a": [1]}), step="s6", file_name="data.csv", index=False, export_viz_tool=True)
+    assert len(Step._from_file(str(tmp_path / "step_s6" / "metadata.json")).md_all_files) == 7
+
+    # compacting the journal of a compacted directory keeps the references
+    step = Step(root=root, version=None)
+    step.load(step="s4", file_name="data.csv")
+    step.save(pd.DataFrame({"a": [2]}), step="s5", file_name="data.csv", index=False)
+    compact_root(root)
+    with open(last) as f:
+        refs = sum("ref" in r for r in json.load(f)["files"])
+    assert refs > 0
+    step.save(pd.DataFrame({"a": [2]}), step="s5", file_name="other.csv", index=False, export_viz_tool=True)
+    with open(last) as f:
+        assert sum("ref" in r for r in json.load(f)["files"]) == refs
+    assert len(Step._from_file(last).md_all_files) == 7
+
+
+def test_compact_command(tmp_path):
+    chain(str(tmp_path), 3)
+    subprocess.run([sys.executable, "-m", "stdflow", "compact", str(tmp_path)], check=True, capture_output=True)
+    assert len(read_store(store_path(str(tmp_path)))) == 1
+    assert sf.compact(str(tmp_path))["records_stored"] == 0
+
+
+def test_compact_root_keeps_concurrent_appends(tmp_path, monkeypatch):
+    import stdflow.stdflow_utils.record_store as record_store
+
+    root = str(tmp_path)
+    chain(root, 2)
+    metadata_path = str(tmp_path / "step_s1" / "metadata.json")
+    appended = dict(read_records(metadata_path)[-1], uuid="appended-while-compacting")
+    add_to_store, calls = record_store.add_to_store, []
+
+    def save_meanwhile(path, records):
+        calls.append(path)
+        if len(calls) == 2:  # while compacting step_s1
+            append_records(metadata_path, [appended])
+        return add_to_store(path, records)
+
+    monkeypatch.setattr(record_store, "add_to_store", save_meanwhile)
+    compact_root(root)
+    assert appended["uuid"] in [r["uuid"] for r in read_records(metadata_path)]
@@ -0,0 +1,84 @@
+import os
+
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.stdflow_utils.retention import RetentionPolicy, collect_garbage
+from stdflow.stdflow_utils.versions import read_versions
+
+
+def _versions(**sizes):
+    return [dict(version=v, created=float(i), size=size) for i, (v, size) in enumerate(sizes.items())]
+
+
+def test_policy_select():
+    versions = _versions(a=10, b=10, c=10, d=10)
+    assert RetentionPolicy(keep_last=2).select(versions) == ["a", "b"]
+    assert RetentionPolicy(newer_than=1.5).select(versions, now=3.0) == ["a", "b"]
+    assert RetentionPolicy(keep_last=1, newer_than=2.5).select(versions, now=3.0) == ["a"]
+    assert RetentionPolicy(max_bytes=25).select(versions) == ["a", "b"]
+    # the last version is kept even over budget
+    assert RetentionPolicy(max_bytes=5).select(versions) == ["a", "b", "c"]
+    assert RetentionPolicy(keep_last=1).select([]) == []
+    with pytest.raises(ValueError):
+        RetentionPolicy()
+
+
+def test_collect_garbage_honours_lineage(tmp_path):
+    root = str(tmp_path)
+    step = Step(root=root)
+    for version in ["1", "2", "3"]:
+        step.save(pd.DataFrame({"a": [int(version)] * 100}), step="raw", version=version, file_name="raw.csv", index=False)
+
+    # clean is generated from the first version of raw
+    step = Step(root=root)
+    df = step.load(step="raw", version="1", file_name="raw.csv")
+    step.save(df, step="clean", version="1", file_name="clean.csv", index=False)
+
+    summary = collect_garbage(root, RetentionPolicy(keep_last=1), dry_run=True)
+    assert summary["deleted"] == [os.path.join(root, "step_raw", "v_2")]
+    assert os.path.isdir(tmp_path / "step_raw" / "v_2")
+
+    summary = collect_garbage(root, RetentionPolicy(keep_last=1))
+    assert summary["protected"] == [os.path.join(root, "step_raw", "v_1")]
+    assert summary["deleted"] == [os.path.join(root, "step_raw", "v_2")]
+    assert summary["bytes_reclaimed"] > 0
+    assert sorted(os.listdir(tmp_path / "step_raw")) == [".versions", "v_1", "v_3"]
+    assert [v["version"] for v in read_versions(str(tmp_path / "step_raw"))] == ["1", "3"]
+    assert Step(root=root).load(step="clean", version=":last", file_name="clean.csv")["a"].tolist() == [1] * 100
+
+
+def test_retention_on_save(tmp_path):
+    step = Step(root=str(tmp_path), retention=RetentionPolicy(keep_last=2))
+    for version in ["1", "2", "3"]:
+        step.save(pd.DataFrame({"a": [1]}), step="raw", version=version, file_name="raw.csv", index=False)
+    assert sorted(os.listdir(tmp_path / "step_raw")) == [".versions", "v_2", "v_3"]
+
+    step.save(pd.DataFrame({"a": [1]}), step="raw", version="4", file_name="raw.csv", index=False, retention=None)
+    step.save(
+        pd.DataFrame({"a": [1]}), step="raw", version="5", file_name="raw.csv", index=False,
+        retention=RetentionPolicy(keep_last=1),
+    )
+    assert sorted(os.listdir(tmp_path / "step_raw")) == [".versions", "v_5"]
+
+
+def test_collect_garbage_reads_only_reachable_metadata(tmp_path, monkeypatch):
+    import stdflow.stdflow_utils.retention as retention
+
+    root = str(tmp_path)
+    read = []
+    ancestor_dirs = retention._ancestor_dirs
+    monkeypatch.setattr(retention, "_ancestor_dirs", lambda d, r: read.append(os.path.basename(d)) or ancestor_dirs(d, r))
+
+    step = Step(root=root, retention=RetentionPolicy(keep_last=5))
+    step.save(pd.DataFrame({"a": [1]}), step="other", version=None, file_name="other.csv", index=False)
+    for version in ["1", "2"]:
+        step.save(pd.DataFrame({"a": [1]}), step="raw", version=version, file_name="raw.csv", index=False)
+    assert read == []  # nothing to delete: no metadata read
+
+    # metadata last modified before the versions to delete were created cannot come from them
+    os.utime(tmp_path / "step_other" / "metadata.json", (0, 0))
+    summary = collect_garbage(root, RetentionPolicy(keep_last=1))
+    assert summary["deleted"] == [os.path.join(root, "step_raw", "v_1")]
+    assert read == ["v_2"]
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.stdflow_loaders.selection import merge_selections, select_frame
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "country": ["fr", "es", "fr", "de"],
+            "year": [2020, 2020, 2021, 2021],
+            "value": [1, 2, 3, 4],
+            "other": ["a", "b", "c", "d"],
+        }
+    )
+
+
+@pytest.mark.parametrize("file_name", ["data.parquet", "data.feather", "data.csv", "data.pkl"])
+def test_load_columns_filters(tmp_path, df, file_name):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name=file_name, **({"index": False} if file_name.endswith("csv") else {}))
+
+    step = Step(root=str(tmp_path))
+    loaded = step.load(
+        step="raw", version=None, file_name=file_name, columns=["year", "value"], filters=[("country", "==", "fr")]
+    )
+    assert list(loaded.columns) == ["year", "value"]
+    assert loaded["value"].tolist() == [1, 3]
+
+    # metadata of the loaded file still describe the whole file
+    assert [c["name"] for c in step.md_all_files[0].columns] == ["country", "year", "value", "other"]
+
+
+def test_selection_recorded_in_lineage(tmp_path, df):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name="data.parquet")
+
+    step = Step(root=str(tmp_path), version=None)
+    loaded = step.load(step="raw", file_name="data.parquet", columns=["value"], filters=[("year", ">", 2020)], alias="raw")
+    step.save(loaded, step="out", file_name="out.parquet")
+
+    input_file = step.md_all_files[-1].input_files[0]
+    assert input_file["uuid"] == step.md_direct_input_files[0].uuid
+    assert input_file["selection"] == {"columns": ["value"], "filters": [[["year", ">", 2020]]]}
+    # only projected columns are documented
+    assert step.doc.input_df_alias_to_cols["raw"] == ["value"]
+
+
+def test_load_chunks_with_selection(tmp_path, df):
+    os.makedirs(tmp_path / "step_raw")
+    df.to_csv(tmp_path / "step_raw" / "data.csv", index=False)
+
+    chunks = Step(root=str(tmp_path)).load(
+        step="raw", version=None, file_name="data.csv", chunksize=2, columns=["value"], filters=[("country", "=", "fr")]
+    )
+    assert pd.concat(chunks)["value"].tolist() == [1, 3]
+
+
+def test_select_frame_or_filters(df):
+    selected = select_frame(df, ["value"], [[("country", "=", "es")], [("year", "=", 2021)]])
+    assert selected["value"].tolist() == [2, 3, 4]
+
+
+def test_merge_selections():
+    a = {"columns": ["a"], "filters": [[["x", "=", 1]]]}
+    b = {"columns": ["b"], "filters": [[["x", "=", 1]]]}
+    assert merge_selections(a, b) == {"columns": ["a", "b"], "filters": [[["x", "=", 1]]]}
+    assert merge_selections(a, None) is None
+    assert merge_selections(a, {"columns": None, "filters": None}) is None
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.config import SHADOW_DIR
+from stdflow.stdflow_loaders import shadow
+from stdflow.stdflow_utils.listing import list_non_metadata_files
+from stdflow.step import loaders
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"country": ["fr", "es", "it"], "value": [1, 2, 3]})
+
+
+def test_load_shadow(tmp_path, df, monkeypatch):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name="data.csv", index=False)
+    raw_dir = tmp_path / "step_raw"
+
+    first = Step(root=str(tmp_path)).load(step="raw", version=None, file_name="data.csv", shadow=True)
+    assert (raw_dir / SHADOW_DIR / "data.csv.parquet").exists()
+    assert list_non_metadata_files(str(raw_dir)) == ["data.csv"]
+
+    # served from the shadow copy without parsing the csv
+    monkeypatch.setitem(loaders, "csv", None)
+    step = Step(root=str(tmp_path))
+    second = step.load(step="raw", version=None, file_name="data.csv", shadow=True, columns=["value"])
+    assert second.equals(first[["value"]])
+    assert [c["name"] for c in step.md_all_files[0].columns] == ["country", "value"]
+
+
+def test_shadow_invalidated(tmp_path, df):
+    os.makedirs(tmp_path / "step_raw")
+    file_path = str(tmp_path / "step_raw" / "data.csv")
+    df.to_csv(file_path, index=False)
+    Step(root=str(tmp_path)).load(step="raw", version=None, file_name="data.csv", shadow=True)
+
+    # same size and hash but touched: still valid
+    os.utime(file_path, ns=(0, 0))
+    _, info_path = shadow.shadow_paths(file_path)
+    assert shadow._is_fresh(shadow._read_info(info_path), file_path, os.stat(file_path))
+
+    df.assign(value=[7, 8, 9]).to_csv(file_path, index=False)
+    loaded = Step(root=str(tmp_path)).load(step="raw", version=None, file_name="data.csv", shadow=True)
+    assert loaded["value"].tolist() == [7, 8, 9]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stdflow import Step
+from stdflow.stdflow_utils.stats import compute_stats, may_match
+
+
+def test_compute_stats():
+    df = pd.DataFrame(
+        {
+            "id": np.arange(20_000) % 5_000,
+            "day": pd.date_range("2023-01-01", periods=20_000, freq="h"),
+            "name": [None, "a", "b", "c"] * 5_000,
+        }
+    )
+    stats = compute_stats(df)
+
+    assert stats["n_rows"] == 20_000
+    assert stats["columns"]["id"]["min"] == 0 and stats["columns"]["id"]["max"] == 4_999
+    assert stats["columns"]["id"]["distinct"] == pytest.approx(5_000, rel=0.05)
+    assert stats["columns"]["name"]["null_count"] == 5_000
+    assert stats["columns"]["name"]["distinct"] == 3
+    assert stats["columns"]["day"]["min"] == "2023-01-01T00:00:00"
+    assert stats["nbytes"] == sum(c["nbytes"] for c in stats["columns"].values())
+
+
+def test_may_match():
+    stats = compute_stats(pd.DataFrame({"a": [10, 20], "day": pd.to_datetime(["2023-01-01", "2023-01-31"])}))
+    assert may_match(stats, [("a", ">", 15)])
+    assert not may_match(stats, [("a", ">", 20)])
+    assert not may_match(stats, [("a", "in", [1, 30])])
+    assert may_match(stats, [[("a", "<", 0)], [("a", "==", 10)]])
+    assert not may_match(stats, [("day", ">=", pd.Timestamp("2023-02-01"))])
+    assert may_match(stats, [("a", ">", "x")])  # not comparable
+    assert may_match(None, [("a", ">", 20)])
+
+
+def test_save_stats(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(pd.DataFrame({"a": [1, 2, None]}), step="out", file_name="a.csv", index=False, stats=True)
+    chunks = (pd.DataFrame({"a": [i, i + 1]}) for i in range(0, 10, 2))
+    step.save(chunks, step="out", file_name="b.csv", index=False, stats=True)
+    step.save(pd.DataFrame({"a": [1]}), step="out", file_name="c.csv", index=False)
+
+    a, b, c = Step._from_file(str(tmp_path / "step_out" / "metadata.json")).md_all_files
+    assert a.stats["columns"]["a"] == dict(null_count=1, distinct=2, min=1.0, max=2.0, nbytes=24)
+    assert b.stats["n_rows"] == 10 and b.stats["columns"]["a"]["max"] == 9
+    assert c.stats is None
+
+
+def test_load_skips_files_from_stats(tmp_path):
+    step = Step(root=str(tmp_path), version=None)
+    for day in range(5):
+        df = pd.DataFrame({"day": [day] * 3, "value": range(3)})
+        step.save(df, step="raw", file_name=f"day_{day}.parquet", stats=True)
+
+    step = Step(root=str(tmp_path), version=None)
+    df = step.load(step="raw", file_name="day_*.parquet", combine="concat", filters=[("day", ">=", 3)])
+    assert df["day"].tolist() == [3, 3, 3, 4, 4, 4]
+    assert [f.path.file_name for f in step.md_direct_input_files] == ["day_3.parquet", "day_4.parquet"]
+
+    df = step.load(step="raw", file_name="day_*.parquet", combine="concat", filters=[("day", ">", 10)])
+    assert df.empty and list(df.columns) == ["day", "value"]
@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+import pytest
+
+from stdflow import Step
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"country": ["fr", "es", "it", "de", "pt"], "value": [1, 2, 3, 4, 5]})
+
+
+@pytest.mark.parametrize("file_name", ["data.csv", "data.parquet", "data.jsonl"])
+def test_load_chunksize(tmp_path, df, file_name):
+    step = Step(root=str(tmp_path), step_in="raw", step_out="processed", version=None)
+    step.save(df, step="raw", file_name=file_name, **({"index": False} if file_name.endswith("csv") else {}))
+
+    step.reset()
+    step.root = str(tmp_path)
+    chunks = step.load(step="raw", version=None, file_name=file_name, chunksize=2)
+
+    # recorded once, before the iterator is consumed
+    assert len(step.md_all_files) == 1
+    assert len(step.md_direct_input_files) == 1
+    assert [c["name"] for c in step.md_direct_input_files[0].columns] == ["country", "value"]
+
+    chunks = list(chunks)
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert pd.concat(chunks, ignore_index=True).equals(df)
+    assert len(step.md_all_files) == 1
+
+
+def test_load_stream_parquet_row_groups(tmp_path, df):
+    os.makedirs(tmp_path / "step_raw")
+    df.to_parquet(tmp_path / "step_raw" / "data.parquet", row_group_size=3)
+
+    step = Step(root=str(tmp_path))
+    chunks = list(step.load(step="raw", version=None, file_name="data.parquet", stream=True))
+    assert [len(c) for c in chunks] == [3, 2]
+    assert [c["name"] for c in step.md_all_files[0].columns] == ["country", "value"]
+
+
+def test_load_stream_unsupported_method(tmp_path, df):
+    os.makedirs(tmp_path / "step_raw")
+    df.to_pickle(tmp_path / "step_raw" / "data.pkl")
+
+    step = Step(root=str(tmp_path))
+    with pytest.raises(ValueError):
+        step.load(step="raw", version=None, file_name="data.pkl", stream=True)
+
+
+@pytest.mark.parametrize("file_name", ["data.csv", "data.parquet", "data.jsonl"])
+def test_save_chunks(tmp_path, df, file_name):
+    step = Step(root=str(tmp_path), version=None)
+    kwargs = {"index": False} if not file_name.endswith("jsonl") else {}
+    path = step.save((df.iloc[i : i + 2] for i in range(0, len(df), 2)), step="out", file_name=file_name, **kwargs)
+
+    loaded = Step(root=str(tmp_path)).load(step="out", version=None, file_name=file_name)
+    assert loaded.equals(df)
+
+    saved_md = step.md_all_files[-1]
+    assert saved_md.n_rows == 5
+    assert [c["name"] for c in saved_md.columns] == ["country", "value"]
+
+    metadata = Step._from_path(path)
+    assert metadata.md_all_files[-1].n_rows == 5
+
+
+def test_stream_step(tmp_path, df):
+    step = Step(root=str(tmp_path), version=None)
+    step.save(df, step="raw", file_name="data.csv", index=False)
+
+    step.reset()
+    step.root = str(tmp_path)
+    chunks = step.load(step="raw", version=None, file_name="data.csv", chunksize=2)
+    step.save((c.assign(value=c["value"] * 2) for c in chunks), step="out", version=None, file_name="data.parquet")
+
+    assert len(step.md_all_files) == 2
+    assert step.md_all_files[-1].input_files == [{"uuid": step.md_all_files[0].uuid}]
+    out = Step(root=str(tmp_path)).load(step="out", version=None, file_name="data.parquet")
+    assert out["value"].tolist() == [2, 4, 6, 8, 10]
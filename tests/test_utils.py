@@ -120,3 +120,67 @@ def test_path_file_name_auto():
         attrs="fr/idont=exist", step_name="raw", version="coucou", file_name=None
     )
     assert DataPath.from_str(str(path)) == path
+
+
+def test_detect_folders_cache(tmp_path, monkeypatch):
+    from stdflow.stdflow_utils import detect_folders, invalidate_folders
+
+    for v in ["1", "3"]:
+        (tmp_path / f"v_{v}").mkdir()
+    (tmp_path / "v_file.csv").write_text("")
+    assert detect_folders(str(tmp_path), "v_") == ["1", "3"]
+
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or scandir(p))
+    assert detect_folders(str(tmp_path), "v_") == ["1", "3"]
+    assert listed == []  # cached
+
+    (tmp_path / "v_2").mkdir()  # changes the modification time of the directory
+    assert detect_folders(str(tmp_path), "v_") == ["1", "2", "3"]
+    invalidate_folders(str(tmp_path))
+    assert detect_folders(str(tmp_path), "v_") == ["1", "2", "3"]
+    assert len(listed) == 2
+
+
+def test_resolve_latest(tmp_path):
+    from stdflow.stdflow_utils import resolve_latest
+
+    for step, versions in dict(a=["1", "2"], b=["5"], c=[]).items():
+        (tmp_path / f"step_{step}").mkdir()
+        for v in versions:
+            (tmp_path / f"step_{step}" / f"v_{v}").mkdir()
+    dirs = [str(tmp_path / f"step_{s}") for s in ["a", "b", "c", "a"]]
+    assert resolve_latest(dirs) == ["2", "5", None, "2"]
+    assert resolve_latest(dirs, ":first") == ["1", "5", None, "1"]
+    assert resolve_latest([DataPath(str(tmp_path), step_name="a", version="1")]) == ["2"]
+
+
+def test_listing_single_scan(tmp_path, monkeypatch):
+    from stdflow.stdflow_utils.listing import (
+        files_by_extension,
+        invalidate_listing,
+        list_files_glob,
+        list_non_metadata_files,
+    )
+
+    for name in ["b.csv", "a.csv", "c.xlsx", "metadata.json", "metadata.jsonl", ".hidden.csv", "README"]:
+        (tmp_path / name).write_text("")
+    (tmp_path / "sub.csv").mkdir()
+
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or scandir(p))
+    groups = files_by_extension(str(tmp_path))
+    assert groups["csv"] == ["a.csv", "b.csv"]
+    assert groups["xlsx"] == ["c.xlsx"]
+    assert groups[""] == ["README"]
+    assert list_non_metadata_files(str(tmp_path)) == ["a.csv", "b.csv", "c.xlsx"]
+    assert list_files_glob(str(tmp_path), "*.csv") == ["a.csv", "b.csv", "sub.csv"]
+    assert len(listed) == 1  # one pass, then cached
+
+    (tmp_path / "d.csv").write_text("")
+    invalidate_listing(str(tmp_path))
+    assert DataPath(str(tmp_path), version=None, file_name=":auto").file_name is None  # several csv
+    assert files_by_extension(str(tmp_path))["csv"] == ["a.csv", "b.csv", "d.csv"]
+    assert len(listed) == 2
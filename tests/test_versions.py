@@ -0,0 +1,56 @@
+import os
+import shutil
+
+import pandas as pd
+
+from stdflow import Step
+from stdflow.stdflow_path import DataPath
+from stdflow.stdflow_utils.versions import find_version, read_versions
+
+
+def test_last_by_creation_time(tmp_path):
+    step = Step(root=str(tmp_path))
+    # name order differs from creation order
+    for version in ["9", "10", "b", "a"]:
+        step.save(pd.DataFrame({"v": [version]}), step="raw", version=version, file_name="data.csv", index=False)
+    step.save(pd.DataFrame({"v": ["a"]}), step="raw", version="a", file_name="other.csv", index=False)
+
+    versions = read_versions(str(tmp_path / "step_raw"))
+    assert [v["version"] for v in versions] == ["9", "10", "b", "a"]
+    assert versions[-1]["files"] == ["data.csv", "other.csv"]
+
+    assert DataPath(str(tmp_path), step_name="raw", version=":last").version == "a"
+    assert DataPath(str(tmp_path), step_name="raw", version=":first").version == "9"
+    loaded = Step(root=str(tmp_path)).load(step="raw", version=":last", file_name="data.csv")
+    assert loaded["v"].tolist() == ["a"]
+
+
+def test_index_seeded_with_existing_versions(tmp_path):
+    step_dir = tmp_path / "step_raw"
+    for version in ["1", "2"]:
+        (step_dir / f"v_{version}").mkdir(parents=True)
+    assert find_version(str(step_dir), ":last") == "2"
+
+    Step(root=str(tmp_path)).save(pd.DataFrame({"a": [1]}), step="raw", version="0", file_name="a.csv", index=False)
+    assert [v["version"] for v in read_versions(str(step_dir))] == ["1", "2", "0"]
+    assert find_version(str(step_dir), ":first") == "1"
+    assert find_version(str(step_dir), ":last") == "0"
+
+    # deleted version: previous one by creation time
+    shutil.rmtree(step_dir / "v_0")
+    assert find_version(str(step_dir), ":last") == "2"
+
+
+def test_versions_not_indexed(tmp_path):
+    step = Step(root=str(tmp_path))
+    for version in ["b", "a"]:
+        step.save(pd.DataFrame({"v": [version]}), step="raw", version=version, file_name="data.csv", index=False)
+    step_dir = tmp_path / "step_raw"
+
+    shutil.rmtree(step_dir / "v_a")
+    assert find_version(str(step_dir), ":last") == "b"
+    # created without saving, e.g. copied: ordered by the modification time of its directory
+    shutil.copytree(step_dir / "v_b", step_dir / "v_0", copy_function=shutil.copy)
+    os.utime(step_dir / "v_0")
+    assert find_version(str(step_dir), ":last") == "0"
+    assert find_version(str(step_dir), ":first") == "b"